@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.translator import TranslationService
+from utils.cache import TranslationCache
+from utils.async_translator import AsyncTranslationService
+from utils.backends import FakeBackend, HttpBackend, serve_fake_backend
+
+# Compares the blocking translation path served by a fixed pool of worker
+# threads with the asyncio path on a single event loop. The upstream is a
+# local fake that answers after a fixed delay, so only concurrency is measured.
+# With --http the fake runs as a local HTTP server and requests cross a socket.
+# Usage: python -m bench.bench_async --requests 500 --latency 0.05 --threads 8
+
+
+def make_service(backend):
+    # Caching is disabled so every request reaches the fake upstream
+    return TranslationService(backend, cache=TranslationCache(max_entries=0))
+
+
+def bench_threads(texts, backend, threads):
+    service = make_service(backend)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(lambda text: service.translate_text(text, 'fr'), texts))
+    return time.perf_counter() - start
+
+
+def bench_async(texts, backend):
+    service = AsyncTranslationService(make_service(backend))
+
+    async def run():
+        await asyncio.gather(*(service.translate_text(text, 'fr') for text in texts))
+        await service.aclose()
+
+    start = time.perf_counter()
+    asyncio.run(run())
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare threaded and asyncio translation throughput')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--http', action='store_true', help='serve the fake upstream over local HTTP')
+    args = parser.parse_args()
+
+    texts = [f'sentence number {i}' for i in range(args.requests)]
+    fake = FakeBackend(args.latency, args.jitter)
+
+    if args.http:
+        server = serve_fake_backend('127.0.0.1', 0, fake)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        threaded = bench_threads(texts, HttpBackend(url), args.threads)
+        asynchronous = bench_async(texts, HttpBackend(url))
+        server.shutdown()
+    else:
+        threaded = bench_threads(texts, fake, args.threads)
+        asynchronous = bench_async(texts, fake)
+
+    upstream = 'local HTTP' if args.http else 'in-process'
+    print(f"{args.requests} requests, {args.latency * 1000:.0f} ms {upstream} fake upstream latency")
+    print(f"  sync, {args.threads} threads: {threaded:.3f} s ({args.requests / threaded:.0f} req/s)")
+    print(f"  asyncio, one loop:  {asynchronous:.3f} s ({args.requests / asynchronous:.0f} req/s)")
+    print(f"  speedup: {threaded / asynchronous:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from PIL import Image
+from desktop.assets import AssetCache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measures desktop cold start. The asset part needs no display: it compares
+# the original loading code (open and resize all six PNGs) with the asset
+# cache on a first launch (empty cache) and on later launches. When a display
+# is available it also reports time-to-first-frame of the whole app in fresh
+# interpreters: with the original loader put back in place of the asset cache
+# (the number to compare with), and with an empty and a built asset cache.
+# Usage: python -m bench.bench_desktop_startup --repeat 5
+
+# The images and sizes the desktop app used to load on every launch
+LEGACY_ASSETS = [
+    ('frame_1.png', (1200, 800)),
+    ('btn_swap.png', (50, 50)),
+    ('button.png', (50, 50)),
+    ('sound_button.png', (50, 50)),
+    ('text_field.png', (450, 400)),
+    ('translate_btn.png', (150, 50)),
+]
+# The images the desktop app shows at startup
+VISIBLE_ASSETS = [LEGACY_ASSETS[0], LEGACY_ASSETS[1], LEGACY_ASSETS[3], LEGACY_ASSETS[5]]
+
+_FIRST_FRAME = '''
+import time
+start = time.perf_counter()
+import tkinter as tk
+from desktop.app import AITranslatorApp
+{setup}
+root = tk.Tk()
+app = AITranslatorApp(root)
+root.update()
+print(time.perf_counter() - start)
+root.destroy()
+'''
+
+
+# setup_assets_path of the desktop app before the asset cache: every image is
+# decoded and resized at each launch, and all but the background are turned
+# into PhotoImages
+_LEGACY_SETUP = '''
+from PIL import Image, ImageTk
+
+def setup_assets_path(self):
+    self.bg_img = Image.open("img/frame_1.png").resize((1200, 800))
+    self.btn_swap_img_tk = ImageTk.PhotoImage(Image.open("img/btn_swap.png").resize((50, 50)))
+    self.button_img_tk = ImageTk.PhotoImage(Image.open("img/button.png").resize((50, 50)))
+    self.sound_button_img_tk = ImageTk.PhotoImage(Image.open("img/sound_button.png").resize((50, 50)))
+    self.text_field_img_tk = ImageTk.PhotoImage(Image.open("img/text_field.png").resize((450, 400)))
+    self.translate_btn_img_tk = ImageTk.PhotoImage(Image.open("img/translate_btn.png").resize((150, 50)))
+
+AITranslatorApp.setup_assets_path = setup_assets_path
+'''
+
+
+def legacy_load():
+    for name, size in LEGACY_ASSETS:
+        Image.open(os.path.join(ROOT, 'img', name)).resize(size)
+
+
+def cached_load(cache_dir):
+    cache = AssetCache(os.path.join(ROOT, 'img'), cache_dir)
+    for name, size in VISIBLE_ASSETS:
+        cache.image(name, size)
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def first_frame_ms(cache_dir, repeat, cold, legacy=False):
+    env = dict(os.environ, ASSET_CACHE_DIR=cache_dir, TTS_AUDIO='0', TRANSLATION_BACKEND='fake')
+    script = _FIRST_FRAME.format(setup=_LEGACY_SETUP if legacy else '')
+    timings = []
+    for _ in range(repeat):
+        if cold:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+        output = subprocess.run(
+            [sys.executable, '-c', script], cwd=ROOT, env=env,
+            capture_output=True, text=True, check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure desktop asset loading and time-to-first-frame')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        print('Asset loading')
+        print(f"  original (open + resize 6 PNGs)  {median_ms(legacy_load, args.repeat):8.1f} ms")
+
+        def cold():
+            shutil.rmtree(cache_dir, ignore_errors=True)
+            cached_load(cache_dir)
+
+        print(f"  asset cache, first launch        {median_ms(cold, args.repeat):8.1f} ms")
+        print(f"  asset cache, later launches      {median_ms(lambda: cached_load(cache_dir), args.repeat):8.1f} ms")
+
+        if sys.platform.startswith('linux') and not os.environ.get('DISPLAY'):
+            print('Time-to-first-frame skipped: no display')
+            return
+        print('Time-to-first-frame')
+        print(f"  original loader                  {first_frame_ms(cache_dir, args.repeat, True, legacy=True):8.1f} ms")
+        print(f"  empty asset cache                {first_frame_ms(cache_dir, args.repeat, True):8.1f} ms")
+        print(f"  built asset cache                {first_frame_ms(cache_dir, args.repeat, False):8.1f} ms")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
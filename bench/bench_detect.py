@@ -0,0 +1,93 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from langdetect import DetectorFactory, detect, LangDetectException
+from utils.ngram_detector import NGramLanguageModel
+from utils.language_detector import LanguageDetector
+from bench.samples import SAMPLES
+
+# Compares langdetect's randomized pure-Python scoring with the vectorized
+# NumPy model on the labelled samples: accuracy on single sentences and
+# time per call for inputs of growing size. With --batch it also measures
+# LanguageDetector.detect_batch throughput for 1..N worker processes.
+# Usage: python -m bench.bench_detect --repeat 20 --batch 20000
+
+
+def accuracy(detect_func):
+    correct = total = 0
+    for lang, sentences in SAMPLES.items():
+        for sentence in sentences:
+            total += 1
+            try:
+                correct += detect_func(sentence) == lang
+            except LangDetectException:
+                pass
+    return correct, total
+
+
+def time_per_call(detect_func, texts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            detect_func(text)
+    return (time.perf_counter() - start) / (repeat * len(texts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare langdetect with the NumPy n-gram model')
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--batch', type=int, default=0, help='number of texts for the batch benchmark')
+    args = parser.parse_args()
+
+    # Make langdetect's random trials reproducible
+    DetectorFactory.seed = 0
+    model = NGramLanguageModel()
+    model.load()
+    detect('warm up')
+
+    engines = [('langdetect', detect), ('numpy', model.detect)]
+
+    print('Accuracy on labelled sentences')
+    for name, func in engines:
+        correct, total = accuracy(func)
+        print(f"  {name:<10} {correct}/{total} ({correct / total:.1%})")
+
+    print('Time per call')
+    sentences = [sentence for group in SAMPLES.values() for sentence in group]
+    for multiplier in (1, 10, 100):
+        texts = [' '.join([sentence] * multiplier) for sentence in sentences[::4]]
+        size = sum(len(text) for text in texts) // len(texts)
+        timings = [time_per_call(func, texts, max(1, args.repeat // multiplier)) for _, func in engines]
+        print(f"  ~{size:>5} chars: " + '  '.join(
+            f"{name} {timing * 1e3:.3f} ms" for (name, _), timing in zip(engines, timings)
+        ) + f"  speedup {timings[0] / timings[1]:.1f}x")
+
+    if args.batch:
+        bench_batch(args.batch)
+
+
+def bench_batch(size):
+    sentences = [sentence for group in SAMPLES.values() for sentence in group]
+    texts = [sentences[i % len(sentences)] for i in range(size)]
+
+    print(f'Batch detection of {size} texts')
+    workers = 1
+    while True:
+        detector = LanguageDetector()
+        detector.batch_workers = workers
+        detector.detect_batch(texts[:detector.batch_inline_limit + 1])
+        start = time.perf_counter()
+        detector.detect_batch(texts)
+        elapsed = time.perf_counter() - start
+        detector.close()
+        print(f"  {workers:>3} workers: {size / elapsed:,.0f} texts/s")
+        if workers >= (os.cpu_count() or 1):
+            break
+        workers = min(workers * 2, os.cpu_count() or 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Measures cold-start import time of the packages in fresh interpreters and
+# checks it against a budget in milliseconds. Exits with status 1 when a
+# median is over budget, or when an import that should stay headless loads
+# pygame, so it can guard startup time in CI.
+# Usage: python -m bench.bench_import --repeat 5
+
+# (statement, budget in ms, whether pygame may be imported)
+TARGETS = [
+    ('import utils', 50, False),
+    ('import utils.cache, utils.segmenter, utils.singleflight', 100, False),
+    ('from utils import translator', 600, False),
+    ('from utils import language_detector', 600, False),
+    ('import web.app', 1500, False),
+]
+
+_SNIPPET = '''
+import json, sys, time
+start = time.perf_counter()
+{statement}
+print(json.dumps([time.perf_counter() - start, 'pygame' in sys.modules]))
+'''
+
+
+def measure(statement, env):
+    output = subprocess.run(
+        [sys.executable, '-c', _SNIPPET.format(statement=statement)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    elapsed, pygame_loaded = json.loads(output.strip().splitlines()[-1])
+    return elapsed * 1000, pygame_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check cold-start import time against a budget')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help='multiply all budgets, for slow machines')
+    args = parser.parse_args()
+
+    env = dict(os.environ, TTS_AUDIO='0', PYTHONDONTWRITEBYTECODE='1')
+    failed = False
+    for statement, budget, pygame_allowed in TARGETS:
+        runs = [measure(statement, env) for _ in range(args.repeat)]
+        median = statistics.median(elapsed for elapsed, _ in runs)
+        pygame_loaded = any(loaded for _, loaded in runs)
+        budget *= args.scale
+
+        problems = []
+        if median > budget:
+            problems.append(f'over budget of {budget:.0f} ms')
+        if pygame_loaded and not pygame_allowed:
+            problems.append('imported pygame')
+        failed = failed or bool(problems)
+
+        status = 'FAIL ' + ', '.join(problems) if problems else 'ok'
+        print(f"  {statement:<58} {median:8.1f} ms  {status}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
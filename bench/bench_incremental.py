@@ -0,0 +1,80 @@
+import argparse
+import os
+import random
+import sys
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.translator import TranslationService
+from utils.cache import TranslationCache
+from utils.incremental import IncrementalTranslator
+from utils.segmenter import chunk_text
+from utils.backends import FakeBackend
+
+# Counts the upstream calls of the desktop's incremental translator while a
+# document is translated, edited in the middle and extended at the end, with
+# and without a known source language. The first translation must not take
+# more calls than translating the document in chunks; the script exits with
+# status 1 when it does.
+# Usage: python -m bench.bench_incremental --sentences 200
+
+WORDS = ['the', 'report', 'was', 'sent', 'to', 'our', 'team', 'and', 'it', 'needs', 'a', 'review',
+         'before', 'friday', 'because', 'they', 'asked', 'for', 'new', 'numbers']
+
+
+def make_document(sentences, rng):
+    lines = []
+    for _ in range(sentences):
+        words = rng.choices(WORDS, k=rng.randint(5, 14))
+        lines.append(' '.join(words).capitalize() + '.')
+    # Paragraphs of five sentences
+    return '\n\n'.join(' '.join(lines[i:i + 5]) for i in range(0, len(lines), 5))
+
+
+def run(document, source_lang):
+    backend = FakeBackend(latency=0)
+    service = TranslationService(backend, cache=TranslationCache(max_entries=0))
+    incremental = IncrementalTranslator(service)
+    steps = []
+
+    def step(name, text):
+        calls = backend.calls
+        result = incremental.translate(text, 'fr', source_lang)
+        if not result['success']:
+            raise RuntimeError(f"{name} failed: {result['error']}")
+        steps.append((name, backend.calls - calls, result['segments_translated'], result['segments_reused']))
+
+    step('first translation', document)
+    middle = len(document) // 2
+    cut = document.index('. ', middle) + 1
+    edited = document[:cut] + ' An inserted sentence.' + document[cut:]
+    step('edit in the middle', edited)
+    step('unchanged', edited)
+    step('sentence typed at the end', edited + ' And one more.')
+    return steps
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Count upstream calls of incremental re-translation')
+    parser.add_argument('--sentences', type=int, default=200)
+    args = parser.parse_args()
+
+    document = make_document(args.sentences, random.Random(0))
+    chunk_chars = TranslationService(FakeBackend(latency=0)).chunk_chars
+    budget = sum(1 for chunk in chunk_text(document, chunk_chars) if chunk.text)
+    print(f'Document of {args.sentences} sentences, {len(document)} characters, {budget} chunks')
+
+    over_budget = False
+    for source_lang in (None, 'en'):
+        print(f"source_lang={source_lang}")
+        for name, calls, translated, reused in run(document, source_lang):
+            print(f"  {name:<28} {calls:>4} upstream calls  {translated:>4} sentences translated  {reused:>4} reused")
+            if name == 'first translation' and calls > budget:
+                over_budget = True
+
+    if over_budget:
+        print(f'First translation took more than {budget} upstream calls')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,193 @@
+import argparse
+import hashlib
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.translator import TranslationService
+from utils.cache import TranslationCache
+from utils.translation_memory import TranslationMemory
+from utils.backends import BackendResult, FakeBackend, TranslationBackend
+
+# Translates a repetitive corpus of templated messages (same sentences with
+# different numbers and names) with and without a translation memory and
+# counts the upstream calls, then measures lookup latency as the memory grows.
+# The result cache is disabled so only the memory avoids upstream calls.
+# Adapted results are then checked against a backend that really replaces
+# words, some of them with themselves (cognates such as train or menu).
+# Usage: python -m bench.bench_memory --texts 2000 --sizes 1000 10000 50000
+
+TEMPLATES = [
+    'Order {number} has shipped to {name}.',
+    'Hello {name}, you have {number} new messages.',
+    'Your invoice {number} is due in {small} days.',
+    '{name} commented on your post {number}.',
+    'Payment of {number} dollars received from {name}.',
+    'Ticket {number} was assigned to {name}.',
+]
+NAMES = ['John', 'Mary', 'Ahmed', 'Li', 'Sofia', 'Kenji', 'Olga', 'Pedro', 'Amara', 'Lars']
+# Sentences whose variants differ in ordinary words as well as numbers and names
+COGNATE_TEMPLATES = [
+    'The {vehicle} to {city} leaves at {small} pm from platform {number}.',
+    'Book a {room} at the {place} in {city} for {small} nights.',
+    'The {vehicle} from {city} is {small} minutes late.',
+]
+VEHICLES = ['train', 'plane', 'bus', 'ferry']
+ROOMS = ['room', 'suite', 'table', 'menu']
+PLACES = ['hotel', 'restaurant', 'station', 'airport']
+CITIES = ['Berlin', 'Paris', 'Madrid', 'Oslo', 'Rome']
+# Words the glossary backend keeps unchanged, like loanwords shared by English and French
+COGNATES = {'train', 'bus', 'menu', 'table', 'hotel', 'restaurant', 'station', 'minutes'}
+# Relative frequency of letters in English text
+LETTERS = 'etaoinshrdlcumwfgypbvkjxqz'
+LETTER_WEIGHTS = [12.7, 9.1, 8.2, 7.5, 7.0, 6.7, 6.3, 6.1, 6.0, 4.3, 4.0, 2.8, 2.8, 2.4, 2.4, 2.2,
+                  2.0, 2.0, 1.9, 1.5, 1.0, 0.8, 0.2, 0.2, 0.1, 0.1]
+
+
+def templated_corpus(size, rng):
+    return [
+        rng.choice(TEMPLATES).format(number=rng.randint(1, 99999), name=rng.choice(NAMES), small=rng.randint(2, 30))
+        for _ in range(size)
+    ]
+
+
+def cognate_corpus(size, rng):
+    return [
+        rng.choice(COGNATE_TEMPLATES).format(
+            vehicle=rng.choice(VEHICLES), room=rng.choice(ROOMS), place=rng.choice(PLACES),
+            city=rng.choice(CITIES), small=rng.randint(2, 12), number=rng.randint(1, 30),
+        )
+        for _ in range(size)
+    ]
+
+
+# GlossaryBackend translates word by word with a made-up dictionary: every
+# lowercase word, and the first word of a sentence, becomes a different word
+# derived from its hash, while numbers, names and cognates are kept. Unlike
+# FakeBackend it changes the words, so a memory that swaps ordinary words into a
+# stored translation produces visibly wrong output.
+class GlossaryBackend(TranslationBackend):
+    name = 'glossary'
+
+    def __init__(self):
+        self.calls = 0
+
+    @staticmethod
+    def translate_word(word):
+        if word in COGNATES:
+            return word
+        return 'x' + hashlib.md5(word.encode('utf-8')).hexdigest()[:6]
+
+    def translate(self, text, dest='en', src='auto'):
+        self.calls += 1
+        words = []
+        for i, word in enumerate(text.split(' ')):
+            core = word.rstrip('.,')
+            if core and not core[0].isdigit() and (core.islower() or i == 0):
+                translated = self.translate_word(core.lower())
+                if i == 0:
+                    translated = translated.capitalize()
+                word = translated + word[len(core):]
+            words.append(word)
+        return BackendResult(' '.join(words), 'en' if src == 'auto' else src)
+
+
+def make_vocabulary(size, rng):
+    words = set()
+    while len(words) < size:
+        words.add(''.join(rng.choices(LETTERS, LETTER_WEIGHTS, k=rng.randint(2, 10))))
+    return sorted(words)
+
+
+def random_sentence(vocabulary, weights, rng):
+    # Word frequencies follow Zipf's law like natural text
+    words = rng.choices(vocabulary, weights, k=rng.randint(5, 12))
+    return ' '.join(words).capitalize() + '.'
+
+
+def bench_corpus(texts, latency, memory):
+    backend = FakeBackend(latency=latency)
+    service = TranslationService(backend, cache=TranslationCache(max_entries=0), memory=memory)
+    start = time.perf_counter()
+    for text in texts:
+        service.translate_text(text, 'fr', 'en')
+    return backend.calls, time.perf_counter() - start
+
+
+def check_adapted(texts, memory):
+    """
+    Translate texts through the memory and compare every result with the
+    backend's own translation
+
+    Returns:
+        tuple: (adapted results, wrong results)
+    """
+    backend = GlossaryBackend()
+    service = TranslationService(backend, cache=TranslationCache(max_entries=0), memory=memory)
+    wrong = 0
+    for text in texts:
+        result = service.translate_text(text, 'fr', 'en')
+        if result['translated_text'] != backend.translate(text, 'fr', 'en').text:
+            wrong += 1
+            if wrong <= 3:
+                print(f"    {text!r} -> {result['translated_text']!r}")
+    return memory.stats()['adapted_hits'], wrong
+
+
+def bench_lookup(directory, size, rng):
+    vocabulary = make_vocabulary(5000, rng)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+    memory = TranslationMemory(os.path.join(directory, f'tm-{size}.db'))
+    start = time.perf_counter()
+    for _ in range(size):
+        sentence = random_sentence(vocabulary, weights, rng)
+        memory.add(sentence, '[fr] ' + sentence, 'fr', 'en')
+    build = time.perf_counter() - start
+
+    queries = [random_sentence(vocabulary, weights, rng) for _ in range(200)]
+    for query in queries:
+        memory.lookup(query, 'fr', 'en')
+    stats = memory.stats()
+    print(f"  {size:>7} segments  {stats['bytes'] / 1e6:7.1f} MB  built in {build:5.1f} s  "
+          f"lookup p50 {stats['lookup_ms_p50']:.2f} ms  p99 {stats['lookup_ms_p99']:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure upstream savings and lookup latency of the translation memory')
+    parser.add_argument('--texts', type=int, default=2000)
+    parser.add_argument('--latency', type=float, default=0.0, help='fake upstream delay in seconds')
+    parser.add_argument('--sizes', type=int, nargs='*', default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    directory = tempfile.mkdtemp()
+    try:
+        texts = templated_corpus(args.texts, rng)
+        print(f'Templated corpus of {len(texts)} texts')
+        calls, elapsed = bench_corpus(texts, args.latency, None)
+        print(f"  without memory  {calls:>6} upstream calls  {elapsed:6.2f} s")
+        memory = TranslationMemory(os.path.join(directory, 'corpus.db'))
+        calls, elapsed = bench_corpus(texts, args.latency, memory)
+        stats = memory.stats()
+        print(f"  with memory     {calls:>6} upstream calls  {elapsed:6.2f} s  "
+              f"({stats['exact_hits']} exact, {stats['adapted_hits']} adapted)")
+
+        print('Adapted results checked against a word-replacing backend')
+        texts = templated_corpus(500, rng) + cognate_corpus(500, rng)
+        memory = TranslationMemory(os.path.join(directory, 'check.db'))
+        adapted, wrong = check_adapted(texts, memory)
+        print(f"  {adapted} adapted, {wrong} wrong")
+
+        print('Lookup latency by memory size')
+        for size in args.sizes:
+            bench_lookup(directory, size, rng)
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
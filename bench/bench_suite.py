@@ -0,0 +1,287 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import namedtuple
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.backends import FakeBackend
+from utils.cache import TranslationCache
+from utils.language_detector import LanguageDetector
+from utils.translation_memory import TranslationMemory
+from utils.translator import TranslationService
+from utils.tts_cache import AudioCache
+from bench.samples import SAMPLES
+
+# Repeatable microbenchmarks of the detector, the translation pipeline and the
+# speech synthesis path. Every case is a callable timed one operation at a
+# time: the report has operations per second, p50/p99 latency and memory
+# allocated per operation. Translation runs against an in-process FakeBackend
+# without delay and speech against a fake gTTS, so only local code is measured.
+# Results are saved as JSON and compared with a baseline file; cases that got
+# slower than the threshold are flagged and the exit status is 1.
+# Usage: python -m bench.bench_suite --output results.json --baseline bench/baseline.json
+#        python -m bench.bench_suite --filter detect/ --update-baseline
+
+# A benchmark case; setup() returns the operation to time and an optional cleanup
+Case = namedtuple('Case', ['name', 'setup'])
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Languages of each script group in the detection cases
+SCRIPTS = {
+    'latin': ['en', 'fr', 'de', 'es', 'pl', 'vi'],
+    'cyrillic': ['ru', 'uk', 'bg'],
+    'arabic': ['ar', 'fa'],
+    'cjk': ['zh-cn', 'ja'],
+    'greek': ['el'],
+}
+# Each detection input is a sample sentence repeated this many times
+SIZES = (1, 10, 100)
+
+
+def cycle(items):
+    """Return a function that yields items one after another, forever"""
+    state = {'index': 0}
+
+    def next_item():
+        item = items[state['index'] % len(items)]
+        state['index'] += 1
+        return item
+    return next_item
+
+
+def detect_case(script, size):
+    def setup():
+        detector = LanguageDetector()
+        detector.model.load()
+        texts = [' '.join([sentence] * size) for lang in SCRIPTS[script] for sentence in SAMPLES[lang]]
+        next_text = cycle(texts)
+        return lambda: detector.detect_language(next_text()), None
+    return Case(f'detect/{script}/x{size}', setup)
+
+
+def translate_case(name, cache_entries, text_factory, memory=False, batch=None):
+    def setup():
+        directory = tempfile.mkdtemp(prefix='bench_suite_') if memory else None
+        service = TranslationService(
+            FakeBackend(latency=0),
+            cache=TranslationCache(max_entries=cache_entries),
+            memory=TranslationMemory(os.path.join(directory, 'memory.db')) if memory else None,
+        )
+        next_text = cycle([text_factory(i) for i in range(1000)])
+        if memory:
+            service.translate_text('Order 1 ships to Berlin on day 1.', 'fr', 'en')
+        if batch:
+            batches = [[next_text() for _ in range(batch)] for _ in range(50)]
+            next_batch = cycle(batches)
+            op = lambda: service.translate_batch(next_batch(), 'fr', 'en')
+        else:
+            op = lambda: service.translate_text(next_text(), 'fr', 'en')
+
+        def cleanup():
+            if directory:
+                shutil.rmtree(directory, ignore_errors=True)
+        return op, cleanup
+    return Case(f'translate/{name}', setup)
+
+
+class FakeGTTS:
+    """Stand-in for gTTS that writes deterministic MP3-sized bytes without the network"""
+    def __init__(self, text, lang='en', slow=False):
+        self.payload = (f'{lang}:{int(slow)}:{text}'.encode('utf-8') * 40)[:16000]
+
+    def write_to_fp(self, fp):
+        fp.write(self.payload)
+
+
+def tts_case(name, text_factory):
+    def setup():
+        from utils.text_to_speech import TextToSpeech
+        module = sys.modules['utils.text_to_speech']
+        original = module.gTTS
+        module.gTTS = FakeGTTS
+        directory = tempfile.mkdtemp(prefix='bench_suite_tts_')
+        tts = TextToSpeech(audio_cache=AudioCache(directory), audio=False)
+        counter = iter(range(sys.maxsize))
+        op = lambda: tts.synthesize(text_factory(next(counter)), 'en')
+
+        def cleanup():
+            module.gTTS = original
+            tts.synthesis_pool.shutdown()
+            shutil.rmtree(directory, ignore_errors=True)
+        return op, cleanup
+    return Case(f'tts/{name}', setup)
+
+
+def make_cases():
+    cases = [detect_case(script, size) for script in SCRIPTS for size in SIZES]
+    long_text = ' '.join(['The weather is nice today and we are going to the park.'] * 100)
+    cases += [
+        translate_case('cached', 2048, lambda i: 'The weather is nice today.'),
+        translate_case('uncached', 0, lambda i: f'Sentence number {i} of the benchmark.'),
+        translate_case('uncached/long', 0, lambda i: f'{i}. {long_text}'),
+        translate_case('memory/adapted', 0, lambda i: f'Order {i} ships to Berlin on day {i % 28 + 1}.', memory=True),
+        translate_case('batch/uncached/x50', 0, lambda i: f'Line {i} of the batch.', batch=50),
+        tts_case('cached', lambda i: 'The weather is nice today.'),
+        tts_case('uncached', lambda i: f'Sentence number {i} of the benchmark.'),
+    ]
+    return cases
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def measure(op, min_time, min_ops, alloc_ops):
+    """
+    Time an operation one call at a time and measure its allocations
+
+    Returns:
+        dict: Operations per second, latency percentiles in microseconds and
+        allocation figures per operation
+    """
+    # Warm up caches, lazy imports and the adaptive interpreter
+    for _ in range(max(3, min_ops // 10)):
+        op()
+
+    durations = []
+    gc.collect()
+    start = time.perf_counter()
+    while len(durations) < min_ops or time.perf_counter() - start < min_time:
+        op_start = time.perf_counter_ns()
+        op()
+        durations.append(time.perf_counter_ns() - op_start)
+    elapsed = time.perf_counter() - start
+    durations.sort()
+
+    # CPython does not count allocations; tracemalloc reports the peak of memory
+    # allocated during the call, and the net change of allocated blocks shows
+    # what each call leaves behind
+    gc.collect()
+    blocks = sys.getallocatedblocks()
+    for _ in range(alloc_ops):
+        op()
+    gc.collect()
+    retained_blocks = (sys.getallocatedblocks() - blocks) / alloc_ops
+
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(alloc_ops):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            op()
+            peaks.append(tracemalloc.get_traced_memory()[1] - before)
+    finally:
+        tracemalloc.stop()
+    peaks.sort()
+
+    return {
+        'ops': len(durations),
+        'ops_per_sec': len(durations) / elapsed,
+        'p50_us': percentile(durations, 0.5) / 1000,
+        'p99_us': percentile(durations, 0.99) / 1000,
+        'alloc_bytes_per_op': percentile(peaks, 0.5),
+        'retained_blocks_per_op': retained_blocks,
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Flag cases that are slower than the baseline by more than threshold
+
+    Returns:
+        dict: Change of ops/s and p99 per case present in both, and the
+        names of regressed cases under 'regressions'
+    """
+    changes = {}
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        ops_change = result['ops_per_sec'] / previous['ops_per_sec'] - 1
+        p99_change = result['p99_us'] / previous['p99_us'] - 1 if previous['p99_us'] else 0.0
+        changes[name] = (ops_change, p99_change)
+        if ops_change < -threshold or p99_change > 2 * threshold:
+            regressions.append(name)
+    return changes, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Microbenchmarks of detection, translation and speech synthesis')
+    parser.add_argument('--filter', default='', help='only run cases whose name contains this text')
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds to time each case')
+    parser.add_argument('--min-ops', type=int, default=50, help='fewest operations timed per case')
+    parser.add_argument('--alloc-ops', type=int, default=20, help='operations measured for allocations')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='JSON results to compare with')
+    parser.add_argument('--update-baseline', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help='flag a drop of ops/s by this fraction (or a p99 increase by twice as much)')
+    args = parser.parse_args()
+
+    cases = [case for case in make_cases() if args.filter in case.name]
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as baseline_file:
+            stored = json.load(baseline_file)['results']
+    baseline = {} if args.update_baseline else stored
+
+    results = {}
+    print(f"{'case':<30} {'ops/s':>10} {'p50 us':>10} {'p99 us':>10} {'alloc KiB':>10} {'blocks':>8}  vs baseline")
+    for case in cases:
+        op, cleanup = case.setup()
+        try:
+            result = measure(op, args.min_time, args.min_ops, args.alloc_ops)
+        finally:
+            if cleanup is not None:
+                cleanup()
+        results[case.name] = result
+
+        changes, regressions = compare({case.name: result}, baseline, args.threshold)
+        note = ''
+        if case.name in changes:
+            ops_change, p99_change = changes[case.name]
+            note = f"ops/s {ops_change:+.0%}, p99 {p99_change:+.0%}"
+            if regressions:
+                note += '  REGRESSION'
+        print(f"{case.name:<30} {result['ops_per_sec']:>10,.0f} {result['p50_us']:>10,.1f} {result['p99_us']:>10,.1f} "
+              f"{result['alloc_bytes_per_op'] / 1024:>10,.1f} {result['retained_blocks_per_op']:>8.1f}  {note}")
+
+    report = {
+        'meta': {
+            'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+        },
+        'results': results,
+    }
+    outputs = [(args.output, report)] if args.output else []
+    if args.update_baseline:
+        # Cases left out by --filter keep their stored results
+        outputs.append((args.baseline, dict(report, results=dict(stored, **results))))
+    for path, content in outputs:
+        with open(path, 'w', encoding='utf-8') as output_file:
+            json.dump(content, output_file, indent=2)
+        print(f'Results written to {path}')
+
+    _, regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"{len(regressions)} regression(s) against {args.baseline}: {', '.join(regressions)}")
+        sys.exit(1)
+    if not baseline and not args.update_baseline:
+        print(f'No baseline at {args.baseline}; run with --update-baseline to create it')
+
+
+if __name__ == '__main__':
+    main()
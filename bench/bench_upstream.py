@@ -0,0 +1,99 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.async_translator import AsyncTranslationService
+from utils.backends import FakeBackend
+from utils.cache import TranslationCache
+from utils.translator import TranslationService
+from utils.upstream import ManagedBackend
+
+# Compares calling a flaky upstream directly with calling it through
+# ManagedBackend (deadline, hedging, jittered retries, adaptive concurrency
+# limit, circuit breaker). The fake upstream answers after `latency` plus
+# jitter, a fraction of calls takes `slow_latency` instead and a fraction
+# fails. Reports latency percentiles, the share of successful translations
+# and how many calls reached the upstream.
+# Usage: python -m bench.bench_upstream --requests 1000 --threads 8 --slow-rate 0.02 --error-rate 0.05
+
+
+def make_backend(args):
+    return FakeBackend(args.latency, args.jitter, args.error_rate, args.seed, args.slow_rate, args.slow_latency)
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def run_threads(service, texts, threads):
+    def timed(text):
+        start = time.perf_counter()
+        result = service.translate_text(text, 'fr', 'en')
+        return time.perf_counter() - start, result['success']
+
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        return list(executor.map(timed, texts))
+
+
+def run_async(service, texts, concurrency):
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def timed(text):
+            async with semaphore:
+                start = time.perf_counter()
+                result = await service.translate_text(text, 'fr', 'en')
+                return time.perf_counter() - start, result['success']
+
+        outcomes = await asyncio.gather(*(timed(text) for text in texts))
+        await service.aclose()
+        return outcomes
+
+    return asyncio.run(run())
+
+
+def report(name, outcomes, fake):
+    latencies = sorted(latency for latency, _ in outcomes)
+    succeeded = sum(1 for _, success in outcomes if success)
+    print(f"  {name:<22} p50 {percentile(latencies, 0.5) * 1000:7.1f} ms  "
+          f"p95 {percentile(latencies, 0.95) * 1000:7.1f} ms  p99 {percentile(latencies, 0.99) * 1000:7.1f} ms  "
+          f"ok {succeeded / len(outcomes):6.1%}  upstream calls {fake.calls}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Direct vs managed calls to a flaky fake upstream')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.02)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--slow-rate', type=float, default=0.02)
+    parser.add_argument('--slow-latency', type=float, default=0.5)
+    parser.add_argument('--error-rate', type=float, default=0.05)
+    parser.add_argument('--timeout', type=float, default=2.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    texts = [f'sentence number {i}' for i in range(args.requests)]
+    print(f'{args.requests} requests, {args.threads} concurrent, {args.slow_rate:.0%} slow '
+          f'({args.slow_latency * 1000:.0f} ms), {args.error_rate:.0%} failing')
+
+    for mode in ('threads', 'asyncio'):
+        print(f'{mode}:')
+        for name in ('direct', 'managed'):
+            fake = make_backend(args)
+            backend = ManagedBackend(fake, timeout=args.timeout) if name == 'managed' else fake
+            # Caching is disabled so every request reaches the upstream
+            service = TranslationService(backend, cache=TranslationCache(max_entries=0))
+            if mode == 'threads':
+                outcomes = run_threads(service, texts, args.threads)
+            else:
+                outcomes = run_async(AsyncTranslationService(service), texts, args.threads)
+            report(name, outcomes, fake)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+# Short labelled sentences used by the language detection benchmarks.
+# Keys are the language codes langdetect reports.
+SAMPLES = {
+    'en': [
+        'The weather is nice today and we are going to the park.',
+        'Please send me the report before the meeting tomorrow morning.',
+        'I have never seen such a beautiful sunset over the ocean.',
+    ],
+    'fr': [
+        "Il fait beau aujourd'hui et nous allons au parc.",
+        'Pouvez-vous m\'envoyer le rapport avant la réunion de demain ?',
+        "Je n'ai jamais vu un coucher de soleil aussi beau sur l'océan.",
+    ],
+    'de': [
+        'Das Wetter ist heute schön und wir gehen in den Park.',
+        'Bitte schicken Sie mir den Bericht vor dem Treffen morgen früh.',
+        'Ich habe noch nie einen so schönen Sonnenuntergang über dem Meer gesehen.',
+    ],
+    'es': [
+        'Hoy hace buen tiempo y vamos a ir al parque.',
+        'Por favor, envíame el informe antes de la reunión de mañana.',
+        'Nunca he visto una puesta de sol tan hermosa sobre el océano.',
+    ],
+    'it': [
+        'Oggi il tempo è bello e andiamo al parco.',
+        'Per favore, mandami il rapporto prima della riunione di domani.',
+        'Non ho mai visto un tramonto così bello sul mare.',
+    ],
+    'pt': [
+        'O tempo está bom hoje e nós vamos ao parque.',
+        'Por favor, envie-me o relatório antes da reunião de amanhã.',
+        'Eu nunca vi um pôr do sol tão bonito sobre o oceano.',
+    ],
+    'nl': [
+        'Het weer is vandaag mooi en we gaan naar het park.',
+        'Stuur me alsjeblieft het rapport voor de vergadering van morgen.',
+        'Ik heb nog nooit zo een mooie zonsondergang boven de zee gezien.',
+    ],
+    'sv': [
+        'Vädret är fint idag och vi ska gå till parken.',
+        'Skicka mig rapporten före mötet i morgon bitti.',
+        'Jag har aldrig sett en så vacker solnedgång över havet.',
+    ],
+    'pl': [
+        'Dzisiaj jest ładna pogoda i idziemy do parku.',
+        'Proszę wysłać mi raport przed jutrzejszym spotkaniem.',
+        'Nigdy nie widziałem tak pięknego zachodu słońca nad morzem.',
+    ],
+    'cs': [
+        'Dnes je hezké počasí a jdeme do parku.',
+        'Pošlete mi prosím zprávu před zítřejší schůzkou.',
+        'Nikdy jsem neviděl tak krásný západ slunce nad mořem.',
+    ],
+    'ro': [
+        'Astăzi vremea este frumoasă și mergem în parc.',
+        'Vă rog să îmi trimiteți raportul înainte de ședința de mâine.',
+        'Nu am văzut niciodată un apus de soare atât de frumos deasupra oceanului.',
+    ],
+    'hu': [
+        'Ma szép az idő, és elmegyünk a parkba.',
+        'Kérem, küldje el a jelentést a holnapi megbeszélés előtt.',
+        'Még soha nem láttam ilyen szép naplementét a tenger felett.',
+    ],
+    'fi': [
+        'Tänään on kaunis sää ja menemme puistoon.',
+        'Lähetä minulle raportti ennen huomista kokousta.',
+        'En ole koskaan nähnyt näin kaunista auringonlaskua meren yllä.',
+    ],
+    'tr': [
+        'Bugün hava çok güzel ve parka gidiyoruz.',
+        'Lütfen raporu yarınki toplantıdan önce bana gönderin.',
+        'Okyanusun üzerinde hiç bu kadar güzel bir gün batımı görmedim.',
+    ],
+    'id': [
+        'Cuaca hari ini cerah dan kami akan pergi ke taman.',
+        'Tolong kirimkan laporan itu sebelum rapat besok pagi.',
+        'Saya belum pernah melihat matahari terbenam seindah ini di atas laut.',
+    ],
+    'vi': [
+        'Hôm nay thời tiết đẹp và chúng tôi sẽ đi công viên.',
+        'Vui lòng gửi cho tôi báo cáo trước cuộc họp sáng mai.',
+        'Tôi chưa bao giờ thấy hoàng hôn đẹp như vậy trên biển.',
+    ],
+    'ru': [
+        'Сегодня хорошая погода, и мы идём в парк.',
+        'Пожалуйста, пришлите мне отчёт до завтрашнего совещания.',
+        'Я никогда не видел такого красивого заката над океаном.',
+    ],
+    'uk': [
+        'Сьогодні гарна погода, і ми йдемо до парку.',
+        'Будь ласка, надішліть мені звіт до завтрашньої наради.',
+        'Я ніколи не бачив такого гарного заходу сонця над океаном.',
+    ],
+    'bg': [
+        'Днес времето е хубаво и отиваме в парка.',
+        'Моля, изпратете ми доклада преди утрешната среща.',
+        'Никога не съм виждал толкова красив залез над океана.',
+    ],
+    'hi': [
+        'आज मौसम अच्छा है और हम पार्क जा रहे हैं।',
+        'कृपया कल की बैठक से पहले मुझे रिपोर्ट भेज दें।',
+        'मैंने समुद्र के ऊपर इतना सुंदर सूर्यास्त कभी नहीं देखा।',
+    ],
+    'ar': [
+        'الطقس جميل اليوم وسنذهب إلى الحديقة.',
+        'من فضلك أرسل لي التقرير قبل اجتماع الغد.',
+        'لم أر أبدا غروبا جميلا كهذا فوق المحيط.',
+    ],
+    'fa': [
+        'امروز هوا خوب است و ما به پارک می‌رویم.',
+        'لطفا گزارش را قبل از جلسه فردا برای من بفرستید.',
+        'هرگز چنین غروب زیبایی را بر فراز اقیانوس ندیده بودم.',
+    ],
+    'zh-cn': [
+        '今天天气很好，我们要去公园。',
+        '请在明天的会议之前把报告发给我。',
+        '我从来没有见过海上这么美的日落。',
+    ],
+    'ja': [
+        '今日は天気が良いので公園に行きます。',
+        '明日の会議の前に報告書を送ってください。',
+        '海の上にこんなに美しい夕日を見たことがありません。',
+    ],
+    'ko': [
+        '오늘은 날씨가 좋아서 공원에 갑니다.',
+        '내일 회의 전에 보고서를 보내 주세요.',
+        '바다 위에서 이렇게 아름다운 석양을 본 적이 없습니다.',
+    ],
+    'th': [
+        'วันนี้อากาศดีและเราจะไปสวนสาธารณะ',
+        'กรุณาส่งรายงานให้ฉันก่อนการประชุมพรุ่งนี้',
+        'ฉันไม่เคยเห็นพระอาทิตย์ตกที่สวยงามขนาดนี้เหนือมหาสมุทร',
+    ],
+    'el': [
+        'Σήμερα ο καιρός είναι ωραίος και πάμε στο πάρκο.',
+        'Παρακαλώ στείλτε μου την αναφορά πριν από τη συνάντηση αύριο.',
+        'Δεν έχω δει ποτέ τόσο όμορφο ηλιοβασίλεμα πάνω από τον ωκεανό.',
+    ],
+    'he': [
+        'היום מזג האוויר יפה ואנחנו הולכים לפארק.',
+        'בבקשה שלח לי את הדוח לפני הפגישה מחר.',
+        'מעולם לא ראיתי שקיעה כל כך יפה מעל האוקיינוס.',
+    ],
+}
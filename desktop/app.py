@@ -1,14 +1,16 @@
 import tkinter as tk
 from tkinter import ttk, Canvas, scrolledtext
-from PIL import Image, ImageTk
+from PIL import ImageTk
 import sys
 import os
-import threading
 import time
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from utils import translator, language_detector, text_to_speech
+from utils.incremental import IncrementalTranslator
+from utils.latest_executor import LatestWinsExecutor
+from desktop.assets import AssetCache
 
 class AITranslatorApp:
     def __init__(self, root):
@@ -18,9 +20,16 @@ class AITranslatorApp:
         self.language_options = list(self.languages.items())
         self.last_detected_code = None
         self.typing_timer = None
+        # State of the newest speak request, see handle_speak_text
+        self.speak_job = None
+        # Keeps translated chunks so edits only re-translate what changed
+        self.incremental_translator = IncrementalTranslator(translator)
         self.status_var = tk.StringVar(value="Ready")
         
         self.root = root
+        # Background detect/translate/speak jobs; only the newest job of each
+        # kind reports back, on the Tk main thread
+        self.tasks = LatestWinsExecutor(max_workers=3, dispatch=lambda callback: self.root.after(0, callback))
         self.configure_window()
         self.setup_assets_path()
         self.create_canvas()
@@ -38,28 +47,13 @@ class AITranslatorApp:
         self.root.rowconfigure(0, weight=1)
         
     def setup_assets_path(self):
-        self.bg_img = Image.open("img/frame_1.png")
-        self.bg_img = self.bg_img.resize((1200, 800))
-        
-        self.btn_swap_img = Image.open("img/btn_swap.png")
-        self.btn_swap_img = self.btn_swap_img.resize((50, 50))
-        self.btn_swap_img_tk = ImageTk.PhotoImage(self.btn_swap_img)
-        
-        self.button_img = Image.open("img/button.png")
-        self.button_img = self.button_img.resize((50, 50))
-        self.button_img_tk = ImageTk.PhotoImage(self.button_img)
-        
-        self.sound_button_img = Image.open("img/sound_button.png")
-        self.sound_button_img = self.sound_button_img.resize((50, 50))
-        self.sound_button_img_tk = ImageTk.PhotoImage(self.sound_button_img)
-        
-        self.text_field_img = Image.open("img/text_field.png")
-        self.text_field_img = self.text_field_img.resize((450, 400))
-        self.text_field_img_tk = ImageTk.PhotoImage(self.text_field_img)
-        
-        self.translate_btn_img = Image.open("img/translate_btn.png")
-        self.translate_btn_img = self.translate_btn_img.resize((150, 50))
-        self.translate_btn_img_tk = ImageTk.PhotoImage(self.translate_btn_img)
+        # Resized images come from the asset cache; button.png and text_field.png
+        # are not shown and are only loaded if self.assets.photo() asks for them
+        self.assets = AssetCache("img")
+        self.bg_img = self.assets.image("frame_1.png", (1200, 800))
+        self.btn_swap_img_tk = self.assets.photo("btn_swap.png", (50, 50))
+        self.sound_button_img_tk = self.assets.photo("sound_button.png", (50, 50))
+        self.translate_btn_img_tk = self.assets.photo("translate_btn.png", (150, 50))
         
     def create_canvas(self):
         self.canvas = Canvas(
@@ -116,21 +110,21 @@ class AITranslatorApp:
         # sound button
         self.left_lang_sound_btn = tk.Button(self.lang_select_left_frame, image=self.sound_button_img_tk,
                                              highlightthickness=0, bd=0)
-        self.left_lang_sound_btn.image = self.button_img_tk
+        self.left_lang_sound_btn.image = self.sound_button_img_tk
         
         self.right_lang_sound_btn = tk.Button(self.lang_select_right_frame, image=self.sound_button_img_tk, bg="#D9D9D9", highlightthickness=0, bd=0)
-        self.right_lang_sound_btn.image = self.button_img_tk
+        self.right_lang_sound_btn.image = self.sound_button_img_tk
         
         # language selection combobox
         self.right_lang_select_cbx = ttk.Combobox(self.lang_select_right_frame, state="readonly", width=20, font=("Arial", 14))
         
         # swap button
         self.swap_btn = tk.Button(self.swap_frame, image=self.btn_swap_img_tk, bg="#D9D9D9", highlightthickness=0, bd=0)
-        self.swap_btn.image = self.button_img_tk
+        self.swap_btn.image = self.btn_swap_img_tk
         
         # translate button
         self.translate_btn = tk.Button(self.translate_frame, image=self.translate_btn_img_tk, bg="#D9D9D9", highlightthickness=0, bd=0)
-        self.translate_btn.image = self.button_img_tk
+        self.translate_btn.image = self.translate_btn_img_tk
         
         self.left_lang_sound_btn.grid(row=0, column=2, padx=50)
         
@@ -236,6 +230,8 @@ class AITranslatorApp:
         if self.source_text.get("1.0", tk.END).strip():
             self.typing_timer = self.root.after(500, self.detect_language)
         else:
+            self.tasks.invalidate("detect")
+            self.tasks.invalidate("translate")
             self.detected_language.set("Detecting language...")
             self.target_text.delete("1.0", tk.END)
     
@@ -249,14 +245,8 @@ class AITranslatorApp:
             
         self.status_var.set("Detecting language...")
         
-        # Use threading to avoid blocking UI
-        def detect_thread():
-            result = language_detector.detect_language(text)
-            
-            # Update UI from main thread
-            self.root.after(0, lambda: self.update_detected_language(result))
-            
-        threading.Thread(target=detect_thread, daemon=True).start()
+        # Run in the background to avoid blocking UI; supersedes older detections
+        self.tasks.submit("detect", language_detector.detect_language, self.update_detected_language, text)
     
     def update_detected_language(self, result):
         """Update UI with detected language"""
@@ -286,18 +276,15 @@ class AITranslatorApp:
         
         self.status_var.set("Translating...")
         
-        # Use threading to avoid blocking UI
-        def translate_thread():
-            result = translator.translate_text(
-                text=text,
-                target_lang=target_lang,
-                source_lang=self.last_detected_code
-            )
-            
-            # Update UI from main thread
-            self.root.after(0, lambda: self.update_translation(result))
-            
-        threading.Thread(target=translate_thread, daemon=True).start()
+        # Run in the background to avoid blocking UI; supersedes older translations
+        self.tasks.submit(
+            "translate",
+            self.incremental_translator.translate,
+            self.update_translation,
+            text,
+            target_lang,
+            self.last_detected_code
+        )
     
     def update_translation(self, result):
         """Update UI with translation result"""
@@ -345,26 +332,28 @@ class AITranslatorApp:
             
         self.status_var.set("Playing audio...")
         
-        # Use threading to avoid blocking UI
-        def speak_thread():
-            success = text_to_speech.text_to_speech_memory(text, lang_code)
-            
-            # Update status from main thread
-            if success:
-                self.root.after(0, lambda: self.status_var.set("Audio playing..."))
-                
-                # Check periodically if audio has finished
-                def check_audio():
-                    if not text_to_speech.is_playing:
-                        self.status_var.set("Ready")
-                    else:
-                        self.root.after(100, check_audio)
-                
-                self.root.after(100, check_audio)
-            else:
-                self.root.after(0, lambda: self.status_var.set("Audio playback failed"))
+        # Both callbacks run on the Tk main thread, but a short clip can finish
+        # before the start is reported; the job's state keeps the status from
+        # going back to "Audio playing..." and ignores superseded jobs
+        job = {'finished': False}
+        self.speak_job = job
+        
+        def report_complete(success):
+            job['finished'] = True
+            if self.speak_job is job:
+                self.status_var.set("Ready" if success else "Audio playback failed")
                 
-        threading.Thread(target=speak_thread, daemon=True).start()
+        # Called from the playback thread when the audio has finished
+        def on_complete(success):
+            self.root.after(0, lambda: report_complete(success))
+            
+        def on_started(success):
+            if self.speak_job is not job or (success and job['finished']):
+                return
+            self.status_var.set("Audio playing..." if success else "Audio playback failed")
+            
+        # Run in the background to avoid blocking UI; supersedes older requests
+        self.tasks.submit("speak", text_to_speech.text_to_speech_memory, on_started, text, lang_code, on_complete)
         
 def main():
     root = tk.Tk()
@@ -0,0 +1,94 @@
+from PIL import Image, ImageTk
+import os
+import tempfile
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# AssetCache keeps resized copies of the desktop images so a launch does not
+# decode and resample the full-size PNGs every time. Resized pixels are stored
+# as raw RGBA files named after the source file, its modification time and the
+# target size; loading one is a single file read. Editing an image or asking
+# for another size builds a new entry on the next launch. PhotoImages are
+# created on first request, so images that are never shown are never loaded.
+class AssetCache:
+    def __init__(self, source_dir='img', cache_dir=None):
+        """
+        Args:
+            source_dir (str): Directory of the original images
+            cache_dir (str, optional): Directory of resized copies. Defaults to
+                ASSET_CACHE_DIR or a folder in the system temp directory
+        """
+        self.source_dir = source_dir
+        self.cache_dir = cache_dir or os.environ.get(
+            'ASSET_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_translator_assets')
+        )
+        self._photos = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_path(self, name, size, mtime_ns):
+        stem = os.path.splitext(name)[0]
+        return os.path.join(self.cache_dir, f"{stem}-{size[0]}x{size[1]}-{mtime_ns}.rgba")
+
+    def image(self, name, size):
+        """
+        Return a source image resized to size, from the cache when possible
+
+        Args:
+            name (str): File name inside source_dir
+            size (tuple): Target (width, height)
+
+        Returns:
+            PIL.Image.Image: RGBA image of the requested size
+        """
+        source_path = os.path.join(self.source_dir, name)
+        cache_path = self._cache_path(name, size, os.stat(source_path).st_mtime_ns)
+
+        try:
+            with open(cache_path, 'rb') as cache_file:
+                pixels = cache_file.read()
+            if len(pixels) == size[0] * size[1] * 4:
+                self.hits += 1
+                return Image.frombytes('RGBA', size, pixels)
+        except OSError:
+            pass
+
+        self.misses += 1
+        image = Image.open(source_path).convert('RGBA').resize(size)
+        self._store(cache_path, image)
+        return image
+
+    def photo(self, name, size):
+        """Return a Tk PhotoImage of a resized image, created once per name and size"""
+        key = (name, tuple(size))
+        photo = self._photos.get(key)
+        if photo is None:
+            photo = self._photos[key] = ImageTk.PhotoImage(self.image(name, size))
+        return photo
+
+    def _store(self, cache_path, image):
+        """Write resized pixels atomically and remove entries of older source versions"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    temp_file.write(image.tobytes())
+                os.replace(temp_path, cache_path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            logger.error(f"Failed to write asset cache file {cache_path}: {str(e)}")
+            return
+
+        prefix = os.path.basename(cache_path).rsplit('-', 1)[0] + '-'
+        for entry in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, entry)
+            if entry.startswith(prefix) and entry.endswith('.rgba') and path != cache_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -1,6 +1,36 @@
+import argparse
+
 from web.app import app
 
 if __name__ == "__main__":
-    print("Starting web translator application...")
-    print("Navigate to http://localhost:5000/ in your web browser")
-    app.run(debug=True)
\ No newline at end of file
+    parser = argparse.ArgumentParser(description='Run the web translator application')
+    parser.add_argument('--production', action='store_true',
+                        help='serve with multiple preloaded worker processes instead of the development server; '
+                             'each worker gets a batch detection pool of CPUs / workers processes '
+                             '(see --detect-workers)')
+    parser.add_argument('--bind', default='127.0.0.1:5000', help='address to listen on (production)')
+    parser.add_argument('--workers', type=int, default=None, help='worker processes, default: number of CPUs')
+    parser.add_argument('--threads', type=int, default=8, help='request threads per worker')
+    parser.add_argument('--timeout', type=int, default=60, help='seconds before a stuck worker is restarted')
+    parser.add_argument('--max-requests', type=int, default=0, help='recycle a worker after this many requests')
+    parser.add_argument('--detect-workers', type=int, default=None,
+                        help='batch language detection processes per worker, '
+                             'default: DETECT_BATCH_WORKERS or CPUs / workers (production)')
+    args = parser.parse_args()
+
+    if args.production:
+        from web.server import WebServer
+
+        print(f"Starting web translator application on http://{args.bind}/")
+        WebServer(
+            bind=args.bind,
+            workers=args.workers,
+            threads=args.threads,
+            timeout=args.timeout,
+            max_requests=args.max_requests,
+            detect_workers=args.detect_workers
+        ).run()
+    else:
+        print("Starting web translator application...")
+        print("Navigate to http://localhost:5000/ in your web browser")
+        app.run(debug=True)
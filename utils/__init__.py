@@ -1,10 +1,176 @@
-from .translator import TranslationService
-from .language_detector import LanguageDetector
-from .text_to_speech import TextToSpeech
+import os
+import threading
+import types
+import sys
 
-# Initialize services
-translator = TranslationService()
-language_detector = LanguageDetector()
-text_to_speech = TextToSpeech()
+# Services are created on first access instead of at import time, so importing
+# the package (or one of its modules) does not pay for the translation client,
+# the detector or the audio subsystem until they are used.
+# TRANSLATION_BACKEND selects the upstream: 'google' (default), 'fake' or the
+# URL of a fake upstream server started with `python -m utils.backends`.
+# Upstream calls get deadlines, hedging, retries, an adaptive concurrency limit
+# and a circuit breaker (see utils/upstream.py); UPSTREAM_POLICY=off disables them.
+# TRANSLATION_MEMORY is the path of a SQLite translation memory (off when unset).
+# TTS_AUDIO=0 runs text to speech without local playback (see TextToSpeech);
+# an application can also pass the setting with configure_text_to_speech.
+# DETECT_BATCH_WORKERS sets the size of the batch language detection pool.
 
-__all__ = ['translator', 'language_detector', 'text_to_speech']
+def _create_translator():
+    from .translator import TranslationService
+    from .backends import create_backend
+    from .translation_memory import TranslationMemory
+    from .upstream import ManagedBackend
+    backend = create_backend(os.environ.get('TRANSLATION_BACKEND', 'google'))
+    if os.environ.get('UPSTREAM_POLICY', 'on').lower() not in ('0', 'false', 'no', 'off'):
+        backend = ManagedBackend(backend)
+    memory_path = os.environ.get('TRANSLATION_MEMORY')
+    return TranslationService(
+        backend,
+        memory=TranslationMemory(memory_path) if memory_path else None,
+    )
+
+def _create_language_detector():
+    from .language_detector import LanguageDetector
+    return LanguageDetector()
+
+def _create_text_to_speech(**options):
+    from .text_to_speech import TextToSpeech
+    return TextToSpeech(**options)
+
+_factories = {
+    'translator': _create_translator,
+    'language_detector': _create_language_detector,
+    'text_to_speech': _create_text_to_speech,
+}
+_services = {}
+_options = {}
+_lock = threading.RLock()
+
+
+def _get_service(name):
+    service = _services.get(name)
+    if service is None:
+        with _lock:
+            service = _services.get(name)
+            if service is None:
+                service = _services[name] = _factories[name](**_options.get(name, {}))
+    return service
+
+
+def configure_text_to_speech(**options):
+    """
+    Set the arguments the shared TextToSpeech is created with
+
+    Args:
+        **options: Keyword arguments of TextToSpeech, such as audio=False
+
+    Raises:
+        RuntimeError: If the service was already created
+    """
+    with _lock:
+        if 'text_to_speech' in _services:
+            raise RuntimeError('TextToSpeech was already created')
+        _options['text_to_speech'] = options
+
+
+def get_translator():
+    """Return the shared TranslationService, creating it on first use"""
+    return _get_service('translator')
+
+
+def get_language_detector():
+    """Return the shared LanguageDetector, creating it on first use"""
+    return _get_service('language_detector')
+
+
+def get_text_to_speech():
+    """Return the shared TextToSpeech, creating it on first use"""
+    return _get_service('text_to_speech')
+
+
+def warm_up():
+    """
+    Create all services and load the detector profiles
+
+    Meant to run once in a server's master process before it forks workers, so
+    the workers share the loaded data copy-on-write instead of each loading it.
+    """
+    get_translator()
+    get_language_detector().model.load()
+    get_text_to_speech()
+
+
+def collect_metrics():
+    """
+    Read cache counters of the services created so far, for a metrics scrape
+
+    Returns:
+        list: Metrics with their current values
+    """
+    from .metrics import Counter, Gauge
+    with _lock:
+        services = dict(_services)
+
+    hits = Counter('translator_cache_hits_total', 'Cache lookups that found an entry', ('cache',))
+    misses = Counter('translator_cache_misses_total', 'Cache lookups that found nothing', ('cache',))
+    hit_ratio = Gauge('translator_cache_hit_ratio', 'Fraction of cache lookups that found an entry', ('cache',))
+    size = Gauge('translator_cache_bytes', 'Approximate size of the cache', ('cache',))
+    coalesced = Counter(
+        'translator_upstream_coalesced_total', 'Translation requests that shared an upstream call in flight'
+    )
+
+    def record(cache, stats, hit_count, miss_count):
+        hits.labels(cache).inc(hit_count)
+        misses.labels(cache).inc(miss_count)
+        hit_ratio.labels(cache).set(stats['hit_ratio'])
+        size.labels(cache).set(stats['bytes'] or 0)
+
+    translator = services.get('translator')
+    if translator is not None:
+        stats = translator.get_cache_stats()
+        record('translation', stats, stats['hits'], stats['misses'])
+        stats = translator.get_memory_stats()
+        if stats is not None:
+            record('translation_memory', stats, stats['exact_hits'] + stats['adapted_hits'], stats['misses'])
+        coalesced.inc(translator.get_coalescing_stats()['coalesced'])
+
+    text_to_speech = services.get('text_to_speech')
+    if text_to_speech is not None:
+        stats = text_to_speech.get_cache_stats()
+        record('tts_audio', stats, stats['hits'], stats['misses'])
+
+    return [hits, misses, hit_ratio, size, coalesced]
+
+
+class _LazyService:
+    """Package attribute that resolves to a shared service"""
+    def __init__(self, name):
+        self.name = name
+
+    def __get__(self, module, owner=None):
+        if module is None:
+            return self
+        return _get_service(self.name)
+
+    def __set__(self, module, value):
+        # The submodules translator, language_detector and text_to_speech share
+        # their names with the services; importing them must not hide the service
+        if isinstance(value, types.ModuleType):
+            return
+        with _lock:
+            _services[self.name] = value
+
+
+class _ServicesModule(types.ModuleType):
+    translator = _LazyService('translator')
+    language_detector = _LazyService('language_detector')
+    text_to_speech = _LazyService('text_to_speech')
+
+
+sys.modules[__name__].__class__ = _ServicesModule
+
+__all__ = [
+    'translator', 'language_detector', 'text_to_speech',
+    'get_translator', 'get_language_detector', 'get_text_to_speech', 'configure_text_to_speech',
+    'warm_up', 'collect_metrics',
+]
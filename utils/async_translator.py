@@ -0,0 +1,110 @@
+from .translator import TranslationService
+from . import metrics
+from .segmenter import chunk_text
+import asyncio
+
+# AsyncTranslationService is the asyncio counterpart of TranslationService.
+# Upstream requests go through the async side of the service's backend, so a
+# single event loop can keep hundreds of translations in flight without a thread
+# per request. It runs the pipeline steps of the wrapped synchronous service
+# (result cache, translation memory, result format, storing new translations)
+# and only makes the upstream calls itself.
+class AsyncTranslationService:
+    def __init__(self, service=None, max_concurrency=256):
+        self.service = service if service is not None else TranslationService()
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    @property
+    def languages(self):
+        return self.service.languages
+
+    def get_languages(self):
+        """Return dictionary of available languages"""
+        return self.service.get_languages()
+
+    async def aclose(self):
+        """Close the async client of the backend"""
+        await self.service.backend.aclose()
+
+    async def _fetch(self, text, dest, src):
+        """
+        Send one translation request upstream
+
+        Returns:
+            BackendResult: Translated text and detected source language
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await self.service.backend.atranslate(text, dest, src)
+
+    async def _translate_chunked(self, text, target_lang, source_lang):
+        """Translate a long text as sentence chunks concurrently"""
+        chunks = chunk_text(text, self.service.chunk_chars)
+        results = await asyncio.gather(*(
+            self.translate_text(chunk.text, target_lang, source_lang)
+            for chunk in chunks if chunk.text
+        ))
+        return self.service.merge_chunk_results(text, chunks, results, target_lang)
+
+    async def _translate_upstream(self, text, target_lang, source_lang):
+        """Send one translation request to the backend"""
+        with metrics.TRANSLATE_UPSTREAM.time() as timer:
+            try:
+                translated_text, detected_lang = await self._fetch(
+                    text,
+                    dest=target_lang,
+                    src=source_lang if source_lang else 'auto'
+                )
+                return self.service.success_result(text, detected_lang, translated_text, target_lang)
+
+            except Exception as e:
+                timer.fail()
+                return self.service.upstream_error(text, e)
+
+    async def _translate_uncached(self, text, target_lang, source_lang, cache_key):
+        """Translate text upstream and store the result if it succeeded"""
+        service = self.service
+        if len(text) > service.chunk_chars:
+            translation = await self._translate_chunked(text, target_lang, source_lang)
+            service.store(text, translation, target_lang, source_lang, cache_key, segment=False)
+            return translation
+
+        translation = await self._translate_upstream(text, target_lang, source_lang)
+        if service.memory is not None:
+            # The translation memory is a SQLite file, so it is written off the event loop
+            await asyncio.to_thread(service.store, text, translation, target_lang, source_lang, cache_key)
+        else:
+            service.store(text, translation, target_lang, source_lang, cache_key)
+        return translation
+
+    async def translate_text(self, text, target_lang='en', source_lang=None):
+        """
+        Translate text to target language without blocking the event loop
+
+        Args:
+            text (str): Text to translate
+            target_lang (str): Target language code
+            source_lang (str, optional): Source language code. If None, auto-detect
+
+        Returns:
+            dict: Translation result with text, detected language, and translation
+        """
+        service = self.service
+        cache_key, cached = service.check_cache(text, target_lang, source_lang)
+        if cached is not None:
+            return cached
+
+        # The translation memory is a SQLite file, so it is read off the event loop
+        if service.memory is not None:
+            remembered = await asyncio.to_thread(service.recall, text, target_lang, source_lang, cache_key)
+            if remembered is not None:
+                return remembered
+
+        translation, shared = await service.single_flight.ado(
+            cache_key, lambda: self._translate_uncached(text, target_lang, source_lang, cache_key)
+        )
+        if shared:
+            translation = dict(translation, original_text=text)
+        return translation
@@ -0,0 +1,186 @@
+import io
+import os
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# AudioPlayer plays a sequence of MP3 chunks on one long-lived worker thread that
+# owns the pygame mixer. Other threads send play/stop commands by posting them to
+# pygame's event queue. The worker blocks on that queue and is woken by commands,
+# by the mixer channel's end-of-sound event and by chunks finishing synthesis, so
+# it never polls. Chunks are queued on a reserved channel, which switches to the
+# queued sound without a gap. Completion is reported through a callback that runs
+# on the worker thread. There is one mixer and one event queue per process, so
+# the player is shared through get_audio_player().
+class AudioPlayer:
+    def __init__(self):
+        self.is_playing = False
+        self._pygame = None
+        self._channel = None
+        self._command_event = None
+        self._end_event = None
+        self._playback = None
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """
+        Start the worker and wait until the mixer is initialized
+
+        Raises:
+            Exception: If pygame or the audio device cannot be initialized
+        """
+        threading.Thread(target=self._run, name='audio-player', daemon=True).start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+
+    def play(self, futures, on_complete=None):
+        """
+        Replace the current playback with a sequence of chunks
+
+        Args:
+            futures (list): Futures resolving to MP3 bytes, played in order
+            on_complete (callable, optional): Called with True when the last chunk has
+                finished or False when a chunk failed; not called when stopped
+        """
+        playback = _Playback(futures, on_complete)
+        self._post('play', playback)
+        for future in futures:
+            future.add_done_callback(lambda _, playback=playback: self._post('ready', playback))
+
+    def stop(self):
+        """Stop the current playback"""
+        self._post('stop')
+
+    def _post(self, command, playback=None):
+        # Posting events is thread safe
+        self._pygame.event.post(self._pygame.event.Event(self._command_event, command=command, playback=playback))
+
+    def _run(self):
+        try:
+            import pygame
+            # pygame's event queue needs the video subsystem; the dummy driver
+            # provides it without opening a window or touching the GUI toolkit
+            if not pygame.display.get_init():
+                os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+                pygame.display.init()
+            pygame.mixer.init()
+            pygame.mixer.set_reserved(1)
+
+            self._command_event = pygame.event.custom_type()
+            self._end_event = pygame.event.custom_type()
+            pygame.event.set_blocked(None)
+            pygame.event.set_allowed([self._command_event, self._end_event])
+
+            self._channel = pygame.mixer.Channel(0)
+            self._channel.set_endevent(self._end_event)
+            self._pygame = pygame
+        except Exception as e:
+            self._error = e
+            self._ready.set()
+            return
+
+        self._ready.set()
+        while True:
+            event = pygame.event.wait()
+            try:
+                self._handle(event)
+            except Exception as e:
+                logger.error(f"Audio playback error: {str(e)}")
+
+    def _handle(self, event):
+        if event.type == self._end_event:
+            if self._playback is not None:
+                self._feed()
+            return
+
+        if event.type != self._command_event:
+            return
+        if event.command == 'play':
+            self._stop_current()
+            self._playback = event.playback
+            self.is_playing = True
+            self._feed()
+        elif event.command == 'stop':
+            self._stop_current()
+        elif event.command == 'ready' and event.playback is self._playback:
+            self._feed()
+
+    def _feed(self):
+        """Start or queue every chunk that is ready, in order, and detect the end"""
+        playback = self._playback
+        channel = self._channel
+        while playback.next_index < len(playback.futures):
+            future = playback.futures[playback.next_index]
+            # The channel holds one queued sound behind the playing one
+            if not future.done() or (channel.get_busy() and channel.get_queue() is not None):
+                return
+            try:
+                sound = self._pygame.mixer.Sound(file=io.BytesIO(future.result()))
+            except Exception as e:
+                logger.error(f"TTS chunk error: {str(e)}")
+                self._finish(False)
+                return
+            if channel.get_busy():
+                channel.queue(sound)
+            else:
+                channel.play(sound)
+            playback.next_index += 1
+
+        if not channel.get_busy():
+            self._finish(True)
+
+    def _stop_current(self):
+        if self._playback is None:
+            return
+        self._channel.stop()
+        self._playback.cancel()
+        self._playback = None
+        self.is_playing = False
+
+    def _finish(self, success):
+        playback = self._playback
+        playback.cancel()
+        self._playback = None
+        self.is_playing = False
+        if playback.on_complete is not None:
+            try:
+                playback.on_complete(success)
+            except Exception as e:
+                logger.error(f"Playback callback error: {str(e)}")
+
+
+class _Playback:
+    """Chunks of one playback and the index of the next chunk to start"""
+    def __init__(self, futures, on_complete):
+        self.futures = futures
+        self.on_complete = on_complete
+        self.next_index = 0
+
+    def cancel(self):
+        """Cancel synthesis of chunks that have not started yet"""
+        for future in self.futures[self.next_index:]:
+            future.cancel()
+
+
+_player = None
+_player_lock = threading.Lock()
+
+
+def get_audio_player():
+    """
+    Return the process-wide AudioPlayer, starting it on first use
+
+    Raises:
+        Exception: If pygame or the audio device cannot be initialized
+    """
+    global _player
+    with _player_lock:
+        if _player is None:
+            player = AudioPlayer()
+            player.start()
+            _player = player
+        return _player
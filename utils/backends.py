@@ -0,0 +1,389 @@
+from googletrans import Translator, urls
+from googletrans.client import RPC_ID
+from googletrans.constants import LANGCODES, LANGUAGES, SPECIAL_CASES
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+import httpx
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Result of a single upstream translation call
+BackendResult = namedtuple('BackendResult', ['text', 'src'])
+
+
+class UpstreamStatusError(Exception):
+    """Upstream answered with an unexpected HTTP status code"""
+    def __init__(self, message, status_code):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class DeadlineExceeded(TimeoutError):
+    """An upstream call did not complete before its deadline"""
+
+
+class CircuitOpenError(Exception):
+    """Upstream calls are rejected without being sent after repeated failures"""
+
+
+# Exception classes that exist in every httpx release googletrans works with
+_TIMEOUT_ERRORS = (httpx.ConnectTimeout, httpx.ReadTimeout, httpx.WriteTimeout, httpx.PoolTimeout, TimeoutError)
+_CONNECTION_ERRORS = (httpx.NetworkError, ConnectionError)
+
+
+def classify_error(error):
+    """
+    Name the kind of an upstream failure, for error metrics
+
+    Returns:
+        str: 'timeout', 'connection', 'http_4xx', 'http_5xx', 'http_other',
+        'invalid_request', 'injected', 'circuit_open' or 'other'
+    """
+    if isinstance(error, _TIMEOUT_ERRORS):
+        return 'timeout'
+    if isinstance(error, _CONNECTION_ERRORS):
+        return 'connection'
+    if isinstance(error, UpstreamStatusError):
+        if 400 <= error.status_code < 500:
+            return 'http_4xx'
+        if 500 <= error.status_code < 600:
+            return 'http_5xx'
+        return 'http_other'
+    if isinstance(error, ValueError):
+        return 'invalid_request'
+    if isinstance(error, FakeBackendError):
+        return 'injected'
+    if isinstance(error, CircuitOpenError):
+        return 'circuit_open'
+    return 'other'
+
+
+# TranslationBackend is the interface TranslationService dispatches upstream calls to.
+# A backend translates one piece of text and reports the detected source language.
+# Backends raise an exception on failure; result formatting, caching and batching
+# stay in TranslationService. `atranslate` defaults to running `translate` in a
+# worker thread, backends with a native async client override it.
+class TranslationBackend:
+    name = 'base'
+
+    def translate(self, text, dest='en', src='auto'):
+        """
+        Translate text upstream
+
+        Args:
+            text (str): Text to translate
+            dest (str): Target language code
+            src (str): Source language code or 'auto'
+
+        Returns:
+            BackendResult: Translated text and detected source language
+        """
+        raise NotImplementedError
+
+    async def atranslate(self, text, dest='en', src='auto'):
+        """Async variant of `translate`"""
+        return await asyncio.to_thread(self.translate, text, dest, src)
+
+    async def aclose(self):
+        """Release resources held by the async client"""
+
+
+# Query parameters googletrans sends with every RPC translation request
+_RPC_PARAMS = {
+    'rpcids': RPC_ID,
+    'bl': 'boq_translate-webserver_20201207.13_p0',
+    'soc-app': 1,
+    'soc-platform': 1,
+    'soc-device': 1,
+    'rt': 'c',
+}
+
+# googletrans 4.0.0rc1 fetches the RPC response itself and fails on an error
+# status with an AttributeError (it reads a misspelled attribute). This subclass
+# reuses its response parsing on a payload that was already fetched, so the
+# backend can send the request and report the status code without duplicating
+# the RPC decoding. The payload is kept per thread since the blocking path is
+# called from many threads at once.
+class _PrefetchedTranslator(Translator):
+    def __init__(self):
+        super().__init__()
+        self._prefetched = threading.local()
+
+    def _translate(self, text, dest, src):
+        return self._prefetched.value
+
+    def parse(self, text, dest, src, raw, response):
+        """Parse a fetched RPC response into a googletrans Translated object"""
+        self._prefetched.value = (raw, response)
+        try:
+            return self.translate(text, dest=dest, src=src)
+        finally:
+            self._prefetched.value = None
+
+
+def _normalize_lang(code, allow_auto=False):
+    """Map a language code the same way googletrans.Translator.translate does"""
+    code = code.lower().split('_', 1)[0]
+    if allow_auto and code == 'auto':
+        return code
+    if code in LANGUAGES:
+        return code
+    if code in SPECIAL_CASES:
+        return SPECIAL_CASES[code]
+    if code in LANGCODES:
+        return LANGCODES[code]
+    raise ValueError('invalid source language' if allow_auto else 'invalid destination language')
+
+
+# GoogleTransBackend translates through Google Translate using googletrans.
+# Both paths post the googletrans RPC request themselves, the blocking one through
+# the translator's httpx client and the async one through an httpx.AsyncClient,
+# and raise UpstreamStatusError on an error status so that rate limiting and
+# server errors are retried and counted like those of the other backends.
+class GoogleTransBackend(TranslationBackend):
+    name = 'google'
+
+    def __init__(self):
+        self.translator = Translator()
+        self._async_client = None
+        self._parser = _PrefetchedTranslator()
+
+    def _request(self, text, dest, src):
+        """Return the URL and form data of the RPC request for normalized languages"""
+        url = urls.TRANSLATE_RPC.format(host=self.translator._pick_service_url())
+        data = {'f.req': self.translator._build_rpc_request(text, dest, src)}
+        return url, data
+
+    def _parse(self, text, dest, src, url, response):
+        """Check the status of an RPC response and parse it"""
+        if response.status_code != 200:
+            raise UpstreamStatusError(
+                f'Unexpected status code "{response.status_code}" from {url}', response.status_code
+            )
+        result = self._parser.parse(text, dest, src, response.text, response)
+        return BackendResult(result.text, result.src)
+
+    def translate(self, text, dest='en', src='auto'):
+        dest = _normalize_lang(dest)
+        src = _normalize_lang(src, allow_auto=True)
+
+        url, data = self._request(text, dest, src)
+        response = self.translator.client.post(url, params=_RPC_PARAMS, data=data)
+        return self._parse(text, dest, src, url, response)
+
+    async def atranslate(self, text, dest='en', src='auto'):
+        if self._async_client is None:
+            headers = dict(self.translator.client.headers)
+            self._async_client = httpx.AsyncClient(http2=True, headers=headers)
+
+        dest = _normalize_lang(dest)
+        src = _normalize_lang(src, allow_auto=True)
+
+        url, data = self._request(text, dest, src)
+        response = await self._async_client.post(url, params=_RPC_PARAMS, data=data)
+        return self._parse(text, dest, src, url, response)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+class FakeBackendError(Exception):
+    """Injected upstream failure raised by FakeBackend"""
+
+
+# FakeBackend is a deterministic local stand-in for the upstream translator.
+# Every line is "translated" by prefixing it with the target language code, so
+# line structure is kept and results are predictable. Latency, jitter and the
+# error rate are configurable, and a fraction of calls can be made much slower
+# to model a long latency tail. The random source is seeded so a run can be
+# reproduced exactly.
+class FakeBackend(TranslationBackend):
+    name = 'fake'
+
+    def __init__(self, latency=0.05, jitter=0.0, error_rate=0.0, seed=0, slow_rate=0.0, slow_latency=1.0):
+        """
+        Args:
+            latency (float): Base delay of every call in seconds
+            jitter (float): Maximum extra random delay in seconds
+            error_rate (float): Probability that a call fails
+            seed (int): Seed of the random source
+            slow_rate (float): Probability that a call is delayed by slow_latency instead
+            slow_latency (float): Delay of slow calls in seconds
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _next_call(self):
+        """Draw the delay and failure outcome of the next call"""
+        with self._lock:
+            self.calls += 1
+            delay = self.latency + self._random.uniform(0, self.jitter)
+            if self.slow_rate and self._random.random() < self.slow_rate:
+                delay = self.slow_latency
+            failed = self._random.random() < self.error_rate
+            if failed:
+                self.errors += 1
+            return delay, failed
+
+    @staticmethod
+    def fake_translate(text, dest, src):
+        """Deterministic translation used by the fake upstream"""
+        lines = [f'[{dest}] {line}' if line.strip() else line for line in text.split('\n')]
+        return BackendResult('\n'.join(lines), 'en' if src == 'auto' else src)
+
+    def translate(self, text, dest='en', src='auto'):
+        delay, failed = self._next_call()
+        time.sleep(delay)
+        if failed:
+            raise FakeBackendError('Injected upstream failure')
+        return self.fake_translate(text, dest, src)
+
+    async def atranslate(self, text, dest='en', src='auto'):
+        delay, failed = self._next_call()
+        await asyncio.sleep(delay)
+        if failed:
+            raise FakeBackendError('Injected upstream failure')
+        return self.fake_translate(text, dest, src)
+
+
+# HttpBackend talks to a translation server over a small JSON protocol:
+# POST {base_url}/translate with {"text", "dest", "src"} returns {"text", "src"}.
+# It is the client for the fake upstream started with `serve_fake_backend`.
+class HttpBackend(TranslationBackend):
+    name = 'http'
+
+    def __init__(self, base_url, timeout=30.0):
+        self.url = base_url.rstrip('/') + '/translate'
+        self.timeout = timeout
+        self.client = httpx.Client(timeout=timeout)
+        self._async_client = None
+
+    @staticmethod
+    def _parse(response):
+        if response.status_code != 200:
+            raise UpstreamStatusError(
+                f'Unexpected status code "{response.status_code}" from upstream', response.status_code
+            )
+        data = response.json()
+        return BackendResult(data['text'], data['src'])
+
+    def translate(self, text, dest='en', src='auto'):
+        response = self.client.post(self.url, json={'text': text, 'dest': dest, 'src': src})
+        return self._parse(response)
+
+    async def atranslate(self, text, dest='en', src='auto'):
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(timeout=self.timeout)
+        response = await self._async_client.post(self.url, json={'text': text, 'dest': dest, 'src': src})
+        return self._parse(response)
+
+    async def aclose(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+
+def serve_fake_backend(host='127.0.0.1', port=8765, backend=None):
+    """
+    Create an HTTP server that answers translation requests with a FakeBackend
+
+    The server is returned unstarted; call `serve_forever()` on it, usually in a
+    daemon thread. Port 0 picks a free port, see `server.server_address`.
+
+    Args:
+        host (str): Interface to bind
+        port (int): Port to bind
+        backend (FakeBackend, optional): Backend that produces the responses
+
+    Returns:
+        ThreadingHTTPServer: The configured server
+    """
+    backend = backend if backend is not None else FakeBackend()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            if self.path != '/translate':
+                self.send_error(404)
+                return
+            length = int(self.headers.get('Content-Length', 0))
+            data = json.loads(self.rfile.read(length) or b'{}')
+            try:
+                result = backend.translate(data.get('text', ''), data.get('dest', 'en'), data.get('src', 'auto'))
+                status, payload = 200, {'text': result.text, 'src': result.src}
+            except FakeBackendError as e:
+                status, payload = 503, {'error': str(e)}
+
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    return server
+
+
+def create_backend(spec='google'):
+    """
+    Create a backend from a short specification
+
+    Args:
+        spec (str): 'google', 'fake' or the base URL of an HttpBackend server
+
+    Returns:
+        TranslationBackend: The configured backend
+    """
+    if spec == 'google':
+        return GoogleTransBackend()
+    if spec == 'fake':
+        return FakeBackend()
+    if spec.startswith(('http://', 'https://')):
+        return HttpBackend(spec)
+    raise ValueError(f'Unknown translation backend: {spec}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a local fake translation upstream')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--slow-rate', type=float, default=0.0)
+    parser.add_argument('--slow-latency', type=float, default=1.0)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.latency, args.jitter, args.error_rate, args.seed, args.slow_rate, args.slow_latency)
+    server = serve_fake_backend(args.host, args.port, backend)
+    print(f"Fake translation upstream listening on http://{args.host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+import threading
+import time
+import sys
+import re
+import unicodedata
+from collections import OrderedDict
+
+# Runs of horizontal whitespace are collapsed when building cache keys so that
+# "hello  world" and "hello world" share an entry. Line breaks are kept because
+# they change how the upstream splits sentences.
+_HORIZONTAL_SPACE = re.compile(r'[ \t\f\v\u00a0]+')
+
+# TranslationCache is a thread-safe LRU cache with a time-to-live for every entry.
+# It sits in front of the upstream translation call so repeated requests for the
+# same (text, source language, target language) are answered from memory.
+# The cache is bounded both by number of entries and by an approximate memory size.
+# Hits, misses, evictions and expirations are counted and exposed through `stats`.
+class TranslationCache:
+    def __init__(self, max_entries=2048, max_bytes=16 * 1024 * 1024, ttl=3600):
+        """
+        Args:
+            max_entries (int): Maximum number of cached results. 0 disables caching
+            max_bytes (int): Approximate memory cap for all cached results
+            ttl (float): Seconds an entry stays valid after it was stored
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def normalize_text(text):
+        """Normalize text so equivalent inputs map to the same key"""
+        text = unicodedata.normalize('NFC', text)
+        lines = [_HORIZONTAL_SPACE.sub(' ', line).strip() for line in text.strip().splitlines()]
+        return '\n'.join(lines)
+
+    @classmethod
+    def make_key(cls, text, target_lang, source_lang=None):
+        """
+        Build a cache key for a translation request
+
+        Args:
+            text (str): Text to translate
+            target_lang (str): Target language code
+            source_lang (str, optional): Source language code. None means auto-detect
+
+        Returns:
+            tuple: Hashable cache key
+        """
+        return (
+            cls.normalize_text(text),
+            (source_lang or 'auto').lower(),
+            (target_lang or 'en').lower(),
+        )
+
+    @staticmethod
+    def _estimate_size(key, value):
+        """Approximate the memory used by one entry"""
+        size = sum(sys.getsizeof(part) for part in key)
+        for item in value.values():
+            size += sys.getsizeof(item)
+        return size
+
+    def get(self, key):
+        """
+        Look up a cached result
+
+        Returns:
+            dict: Copy of the cached result or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            value, size, expires_at = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def set(self, key, value):
+        """Store a result, evicting least recently used entries if needed"""
+        if self.max_entries <= 0:
+            return
+
+        size = self._estimate_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+
+            self._entries[key] = (dict(value), size, time.monotonic() + self.ttl)
+            self._bytes += size
+
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all entries. Counters are kept"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Return cache counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
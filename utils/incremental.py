@@ -0,0 +1,126 @@
+from .segmenter import Segment, chunk_text, split_sentences
+import threading
+
+
+def _join(segments):
+    """Text of consecutive segments with the whitespace between them"""
+    return ''.join(segment.text + segment.separator for segment in segments[:-1]) + segments[-1].text
+
+
+# IncrementalTranslator re-translates a document that is being edited.
+# The document is translated in units: chunks of adjacent sentences of at most
+# `max_chars`, so that each sentence is translated with its neighbours and a
+# long document needs few upstream calls. The units of the previous version
+# are kept with their translations; on every update, units found unchanged
+# in the new text are reused and each run of the remaining sentences is
+# chunked into new units and translated. The upstream work follows the size
+# of the edit, not the size of the document.
+class IncrementalTranslator:
+    def __init__(self, service, max_chars=None):
+        """
+        Args:
+            service (TranslationService): Service translating the units
+            max_chars (int, optional): Size budget of a unit. Defaults to the
+                service's chunk_chars
+        """
+        self.service = service
+        self.max_chars = max_chars or service.chunk_chars
+        self._lock = threading.Lock()
+        self._language_pair = None
+        self._units = {}
+
+    def reset(self):
+        """Forget the previous document"""
+        with self._lock:
+            self._language_pair = None
+            self._units = {}
+
+    def _match_units(self, segments, units):
+        """
+        Split segments into reused units and runs of segments to translate
+
+        Returns:
+            list: (segments, result) pairs in document order; result is None
+            for a run that has to be translated
+        """
+        by_first_sentence = {}
+        for unit_text, (sentences, result) in units.items():
+            by_first_sentence.setdefault(sentences[0], []).append((unit_text, len(sentences), result))
+
+        parts = []
+        run = []
+        index = 0
+        while index < len(segments):
+            match = None
+            for unit_text, count, result in by_first_sentence.get(segments[index].text, ()):
+                if _join(segments[index:index + count]) == unit_text:
+                    match = (segments[index:index + count], result)
+                    break
+            if match is None:
+                run.append(segments[index])
+                index += 1
+                continue
+            if run:
+                parts.append((run, None))
+                run = []
+            parts.append(match)
+            index += len(match[0])
+        if run:
+            parts.append((run, None))
+        return parts
+
+    def translate(self, text, target_lang='en', source_lang=None):
+        """
+        Translate text, reusing translations of units seen in the last call
+
+        Args:
+            text (str): The complete current text
+            target_lang (str): Target language code
+            source_lang (str, optional): Source language code. If None, auto-detect
+
+        Returns:
+            dict: Translation result like TranslationService.translate_text, with
+            'segments_translated' and 'segments_reused' counts of sentences
+        """
+        if not text.strip():
+            return self.service.error_result(text, 'Empty text')
+
+        segments = split_sentences(text)
+        leading = [segment for segment in segments if not segment.text]
+        segments = [segment for segment in segments if segment.text]
+
+        language_pair = (target_lang, source_lang)
+        with self._lock:
+            previous = self._units if self._language_pair == language_pair else {}
+
+        # Chunk every run of new or edited sentences into units, keeping the
+        # whitespace that followed the run after its last unit
+        units = []
+        translated_count = 0
+        for part, result in self._match_units(segments, previous):
+            if result is not None:
+                units.append((Segment(_join(part), part[-1].separator), result))
+                continue
+            translated_count += len(part)
+            chunks = chunk_text(_join(part), self.max_chars)
+            chunks[-1] = Segment(chunks[-1].text, part[-1].separator)
+            units.extend((chunk, None) for chunk in chunks)
+
+        pending = list(dict.fromkeys(unit.text for unit, result in units if result is None))
+        translated = dict(zip(pending, self.service.translate_batch(pending, target_lang, source_lang)))
+        units = [(unit, result or translated[unit.text]) for unit, result in units]
+
+        chunks = leading + [unit for unit, _ in units]
+        translation = self.service.merge_chunk_results(text, chunks, [result for _, result in units], target_lang)
+        translation['segments_translated'] = translated_count
+        translation['segments_reused'] = len(segments) - translated_count
+
+        # Remember successful unit translations of this version only
+        with self._lock:
+            self._language_pair = language_pair
+            self._units = {
+                unit.text: ([segment.text for segment in split_sentences(unit.text) if segment.text], result)
+                for unit, result in units if result['success']
+            }
+
+        return translation
@@ -1,14 +1,72 @@
-from langdetect import detect, LangDetectException
+from langdetect import LangDetectException
+from .ngram_detector import NGramLanguageModel
+from . import metrics
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import threading
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Unicode blocks of the scripts the fast detection path looks at, mapped to a
+# one-character script tag. Everything else (digits, punctuation, spaces,
+# unlisted scripts) is neutral and ignored.
+_SCRIPT_RANGES = [
+    (0x0041, 0x005A, 'L'), (0x0061, 0x007A, 'L'), (0x00C0, 0x024F, 'L'),
+    (0x1E00, 0x1EFF, 'L'),
+    (0x0370, 0x03FF, 'G'), (0x1F00, 0x1FFF, 'G'),
+    (0x0400, 0x052F, 'C'),
+    (0x0590, 0x05FF, 'H'),
+    (0x0600, 0x06FF, 'A'), (0x0750, 0x077F, 'A'), (0xFB50, 0xFDFF, 'A'), (0xFE70, 0xFEFF, 'A'),
+    (0x0900, 0x097F, 'D'),
+    (0x0A00, 0x0A7F, 'P'),
+    (0x0E00, 0x0E7F, 'T'),
+    (0x1000, 0x109F, 'M'),
+    (0x1100, 0x11FF, 'K'), (0x3130, 0x318F, 'K'), (0xAC00, 0xD7AF, 'K'),
+    (0x3040, 0x30FF, 'J'), (0x31F0, 0x31FF, 'J'), (0xFF66, 0xFF9F, 'J'),
+    (0x3400, 0x4DBF, 'Z'), (0x4E00, 0x9FFF, 'Z'), (0xF900, 0xFAFF, 'Z'),
+]
+
+
+def _build_script_table():
+    """Build a str.translate table mapping every BMP code point to its script tag"""
+    table = [' '] * 0x10000
+    for start, end, script in _SCRIPT_RANGES:
+        for code_point in range(start, end + 1):
+            table[code_point] = script
+    # Punctuation and digits inside the listed blocks stay neutral
+    for code_point in (0x0374, 0x0375, 0x037E, 0x0387, 0x0589, 0x058A, 0x05BE, 0x05C0, 0x05C3,
+                       0x060C, 0x061B, 0x061F, 0x06D4, 0x0964, 0x0965, 0x0E3F, 0x104A, 0x104B,
+                       0x30FB, 0xFF70):
+        table[code_point] = ' '
+    for start, end in ((0x0660, 0x0669), (0x06F0, 0x06F9), (0x0966, 0x096F), (0x0A66, 0x0A6F),
+                       (0x0E50, 0x0E59), (0x1040, 0x1049)):
+        for code_point in range(start, end + 1):
+            table[code_point] = ' '
+    return ''.join(table)
+
+
+_SCRIPT_TABLE = _build_script_table()
+
+# Scripts used by exactly one of the supported languages
+_SINGLE_LANGUAGE_SCRIPTS = {
+    'G': 'el', 'H': 'iw', 'P': 'pa', 'T': 'th', 'M': 'my', 'K': 'ko',
+}
+
+# Letters that only occur in Persian or only in Arabic spelling
+_PERSIAN_LETTERS = frozenset('\u067e\u0686\u0698\u06af\u06a9\u06cc')
+_ARABIC_LETTERS = frozenset('\u0629\u0643\u0649\u064a')
+
 # LanguageDetector class is used to detect the language of a given text.
-# It uses langdetect library which is a port of Google's language detection library.
-# The class provides a single method `detect_language` which takes a text as input
+# It uses the profiles of langdetect library which is a port of Google's language
+# detection library, scored with the vectorized NGramLanguageModel.
+# The class provides a method `detect_language` which takes a text as input
 # and returns a dictionary with the detected language code and name.
 # If the detection fails, it returns None.
+# `detect_batch` classifies many texts on a pool of worker processes.
 class LanguageDetector:
     def __init__(self):
         # ISO 639-1 language codes and names
@@ -38,12 +96,93 @@ class LanguageDetector:
             'zh-cn': 'zh-cn',
             'zh-tw': 'zh-tw'
         }
+        
+        # Statistical model for text the script check cannot decide
+        self.model = NGramLanguageModel()
+        self.script_sample_chars = 10000
+        
+        # Process pool for batch detection, created on first use. Every process
+        # using the detector starts its own pool; DETECT_BATCH_WORKERS caps it
+        # when several of them share the machine
+        self.batch_workers = int(os.environ.get('DETECT_BATCH_WORKERS') or 0) or os.cpu_count() or 1
+        self.batch_inline_limit = 64
+        self._pool = None
+        self._pool_lock = threading.Lock()
+    
+    def language_info(self, lang_code):
+        """
+        Map a detected language code to the code and name reported to callers
+
+        Chinese variants are mapped to 'zh-cn' or 'zh-tw'. A code without a
+        known name is reported with the code as its name.
+
+        Args:
+            lang_code (str): Language code from the script check or the model
+
+        Returns:
+            dict: Language code and name
+        """
+        if lang_code.startswith('zh'):
+            lang_code = self.chinese_map.get(lang_code, 'zh-cn')
+        return {
+            'code': lang_code,
+            'name': self.language_names.get(lang_code, lang_code)
+        }
+    
+    def detect_language_by_script(self, text):
+        """
+        Detect language from the Unicode script of the text alone
+        
+        Only answers when the dominant script belongs to a single supported
+        language. Latin, Cyrillic, Devanagari and Han-only text is left to the
+        statistical model.
+        
+        Args:
+            text (str): Text to analyze
+            
+        Returns:
+            str: Language code or None if the script is ambiguous
+        """
+        return self._detect_script(text)[0]
+    
+    def _detect_script(self, text):
+        """
+        Detect language from the Unicode script of the text alone
+        
+        Returns:
+            tuple: (language code or None, share of the letters written in the
+            script of that language)
+        """
+        # The beginning of the text is enough to tell its script
+        text = text[:self.script_sample_chars]
+        counts = Counter(text.translate(_SCRIPT_TABLE))
+        counts.pop(' ', None)
+        letters = sum(counts[script] for script in 'LGCHADPTMKJZ')
+        if not letters:
+            return None, 0.0
+            
+        # Kana only appears in Japanese, which mixes it with Han characters
+        if counts['J'] and counts['J'] + counts['Z'] >= letters / 2:
+            return 'ja', (counts['J'] + counts['Z']) / letters
+            
+        script, count = max(((script, counts[script]) for script in 'LGCHADPTMK'), key=lambda item: item[1])
+        if count < letters / 2:
+            return None, 0.0
+            
+        if script in _SINGLE_LANGUAGE_SCRIPTS:
+            return _SINGLE_LANGUAGE_SCRIPTS[script], count / letters
+            
+        # Arabic script is shared by Arabic and Persian; decide on letters
+        # that only one of them uses
+        if script == 'A':
+            characters = set(text)
+            persian = not _PERSIAN_LETTERS.isdisjoint(characters)
+            arabic = not _ARABIC_LETTERS.isdisjoint(characters)
+            if persian != arabic:
+                return 'fa' if persian else 'ar', count / letters
+                
+        return None, 0.0
     
-        # Maps a language code to its ISO 639-1 code and name.
-        # For example, if the input language code is 'zh', it will be mapped
-        # to 'zh-cn' and the name will be 'Chinese (Simplified)'.
-        # If the input language code is not found in the mapping, it will
-        # return the original language code and name.
     def detect_language(self, text):
         """
         Detect language of provided text
@@ -57,21 +196,118 @@ class LanguageDetector:
         if not text or len(text.strip()) < 3:
             return None
             
-        try:
-            # Detect language
-            lang_code = detect(text)
+        with metrics.DETECT.time() as timer:
+            # Scripts that belong to one language need no statistical model
+            lang_code = self.detect_language_by_script(text)
+            if lang_code:
+                return self.language_info(lang_code)
+                
+            try:
+                return self.language_info(self.model.detect(text))
+            except LangDetectException as e:
+                timer.fail()
+                logger.error(f"Language detection error: {str(e)}")
+                return None
+    
+    def detect_candidates(self, text, top_k=3):
+        """
+        Rank the most likely languages of text with calibrated probabilities
+        
+        Long texts are scored on a bounded sample, so the cost is capped
+        whatever the input size. Text decided by its script alone has one
+        candidate whose probability is the share of its letters written in
+        that script.
+        
+        Args:
+            text (str): Text to analyze
+            top_k (int): Maximum number of candidates to return
+            
+        Returns:
+            list: Dictionaries with code, name and probability, most likely first.
+            Empty if detection failed
+        """
+        if not text or len(text.strip()) < 3:
+            return []
             
-            # Handle Chinese variants
-            if lang_code.startswith('zh'):
-                lang_code = self.chinese_map.get(lang_code, 'zh-cn')
+        with metrics.DETECT.time() as timer:
+            # A script used by a single language leaves no alternatives
+            lang_code, share = self._detect_script(text)
+            if lang_code:
+                return [dict(self.language_info(lang_code), probability=round(share, 4))]
                 
-            # Default to English if language is unknown
-            lang_name = self.language_names.get(lang_code, 'English')
+            try:
+                ranked = self.model.rank(text, top_k)
+            except LangDetectException as e:
+                timer.fail()
+                logger.error(f"Language detection error: {str(e)}")
+                return []
             
-            return {
-                'code': lang_code,
-                'name': lang_name
-            }
-        except LangDetectException as e:
-            logger.error(f"Language detection error: {str(e)}")
-            return None
+        return [
+            dict(self.language_info(lang_code), probability=round(probability, 4))
+            for lang_code, probability in ranked
+        ]
+    
+    def _get_pool(self):
+        """Create the worker process pool on first use"""
+        with self._pool_lock:
+            if self._pool is None:
+                # Forking a process that runs request threads can copy a lock
+                # held by another thread into the child and deadlock it, so
+                # workers start from a clean process and load their own profiles
+                method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.batch_workers,
+                    mp_context=multiprocessing.get_context(method),
+                    initializer=_init_batch_worker
+                )
+            return self._pool
+    
+    def close(self):
+        """Shut down the batch worker processes"""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+    
+    def detect_batch(self, texts):
+        """
+        Detect the language of many texts using all CPU cores
+        
+        Texts are sent to the worker processes in chunks so that each
+        inter-process message carries many texts. Small batches are detected
+        in the calling process.
+        
+        Args:
+            texts (list): Texts to analyze
+            
+        Returns:
+            list: Detected language info or None for every text, in input order
+        """
+        if len(texts) <= self.batch_inline_limit or self.batch_workers <= 1:
+            return [self.detect_language(text) for text in texts]
+            
+        # A few chunks per worker keeps all cores busy even if chunks differ in cost
+        chunk_size = max(self.batch_inline_limit, -(-len(texts) // (self.batch_workers * 4)))
+        chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+        
+        results = []
+        for chunk_results in self._get_pool().map(_detect_chunk, chunks):
+            results.extend(chunk_results)
+        return results
+
+
+# Detector used inside a batch worker process
+_worker_detector = None
+
+
+def _init_batch_worker():
+    """Make sure a batch worker process has a loaded detector"""
+    global _worker_detector
+    if _worker_detector is None:
+        _worker_detector = LanguageDetector()
+    _worker_detector.model.load()
+
+
+def _detect_chunk(texts):
+    """Detect the language of a chunk of texts inside a worker process"""
+    return [_worker_detector.detect_language(text) for text in texts]
@@ -0,0 +1,92 @@
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# LatestWinsExecutor runs background jobs on a small shared thread pool where only
+# the newest job of each kind matters (e.g. the detection of the text as it is now).
+# Every submit bumps the generation of its kind: a superseded job that has not
+# started yet is cancelled, and the result of one that was already running is
+# dropped instead of delivered. Results are handed to `dispatch`, which moves the
+# callback to the thread that owns the UI; the generation is checked again there,
+# so a result never lands after a newer job was submitted.
+class LatestWinsExecutor:
+    def __init__(self, max_workers=3, dispatch=None):
+        """
+        Args:
+            max_workers (int): Maximum number of jobs running at once
+            dispatch (callable, optional): Runs a callback on the consumer thread,
+                e.g. `lambda callback: root.after(0, callback)`. Defaults to calling it
+                directly on the worker thread
+        """
+        self.dispatch = dispatch or (lambda callback: callback())
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='latest-wins')
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._futures = {}
+        self.cancelled = 0
+        self.dropped = 0
+
+    def submit(self, kind, func, on_result, *args):
+        """
+        Run func(*args) in the pool and deliver its result if it is still the newest job
+
+        Args:
+            kind (str): Job kind; a new job supersedes older jobs of the same kind
+            func (callable): Function to run in the pool
+            on_result (callable): Called with the result of func through `dispatch`
+
+        Returns:
+            int: Generation of the submitted job
+        """
+        with self._lock:
+            generation = self._supersede(kind)
+            self._futures[kind] = self._executor.submit(self._run, kind, generation, func, args, on_result)
+        return generation
+
+    def invalidate(self, kind):
+        """Cancel or drop every pending job of a kind"""
+        with self._lock:
+            self._supersede(kind)
+            self._futures.pop(kind, None)
+
+    def is_current(self, kind, generation):
+        """Whether generation is the newest job of kind"""
+        with self._lock:
+            return self._generations.get(kind) == generation
+
+    def shutdown(self):
+        """Cancel queued jobs and stop the pool without waiting for running ones"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _supersede(self, kind):
+        """Start a new generation of kind and cancel the previous job if it is still queued"""
+        generation = self._generations.get(kind, 0) + 1
+        self._generations[kind] = generation
+        previous = self._futures.get(kind)
+        if previous is not None and previous.cancel():
+            self.cancelled += 1
+        return generation
+
+    def _run(self, kind, generation, func, args, on_result):
+        if not self.is_current(kind, generation):
+            with self._lock:
+                self.cancelled += 1
+            return
+
+        try:
+            result = func(*args)
+        except Exception as e:
+            logger.error(f"Background {kind} job error: {str(e)}")
+            return
+
+        def deliver():
+            if self.is_current(kind, generation):
+                on_result(result)
+            else:
+                with self._lock:
+                    self.dropped += 1
+
+        self.dispatch(deliver)
@@ -0,0 +1,372 @@
+from bisect import bisect_left
+import math
+import threading
+import time
+
+# Upper bounds in seconds of the default latency buckets, from 0.5 ms to 30 s
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return '+Inf'
+    if value == -math.inf:
+        return '-Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+# Metric is a family of time series sharing a name and label names. Each
+# combination of label values gets one child holding its value; children are
+# created on first use and should be bound once (e.g. at import time) and kept,
+# so recording a sample is one lock and one addition. Values live in process
+# memory, so with several server workers each worker reports its own.
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children = {}
+        if not self.labelnames:
+            self._default = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """Return the child for one combination of label values"""
+        values = tuple(str(value) for value in values)
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f'{self.name} expects labels {self.labelnames}')
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def children(self):
+        """Snapshot of (label values, child) pairs"""
+        if not self.labelnames:
+            return [((), self._default)]
+        with self._lock:
+            return list(self._children.items())
+
+    def samples(self):
+        """Yield (suffix, label values, extra labels, value) for the exposition"""
+        for values, child in self.children():
+            yield '', values, (), child.get()
+
+    def expose(self):
+        """Render the family in the Prometheus text format"""
+        lines = [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.kind}',
+        ]
+        for suffix, values, extra, value in self.samples():
+            lines.append(f'{self.name}{suffix}{_format_labels(self.labelnames, values, extra)} {_format_value(value)}')
+        return '\n'.join(lines)
+
+
+class _CounterChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def get(self):
+        return self._value
+
+
+class Counter(Metric):
+    """Monotonically increasing count of events"""
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+
+class _GaugeChild:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0.0
+
+    def inc(self, amount=1):
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount=1):
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value):
+        self._value = value
+
+    def get(self):
+        return self._value
+
+    def track_in_progress(self):
+        """Context manager counting the code blocks currently running"""
+        return _InProgress(self)
+
+
+class _InProgress:
+    __slots__ = ('gauge',)
+
+    def __init__(self, gauge):
+        self.gauge = gauge
+
+    def __enter__(self):
+        self.gauge.inc()
+
+    def __exit__(self, *exc_info):
+        self.gauge.dec()
+
+
+class Gauge(Metric):
+    """Value that goes up and down, such as the number of calls in flight"""
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount=1):
+        self._default.inc(amount)
+
+    def dec(self, amount=1):
+        self._default.dec(amount)
+
+    def set(self, value):
+        self._default.set(value)
+
+
+class _HistogramChild:
+    def __init__(self, bounds):
+        self._bounds = bounds
+        self._lock = threading.Lock()
+        # One count per bucket plus one for values above the last bound
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+
+    def observe(self, value):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self):
+        """Context manager observing the duration of a code block in seconds"""
+        return _Timer(self)
+
+    def get(self):
+        """Return (cumulative bucket counts, sum, count)"""
+        with self._lock:
+            counts = list(self._counts)
+            total = self._sum
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+
+
+class _Timer:
+    __slots__ = ('histogram', 'start')
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start)
+
+
+class Histogram(Metric):
+    """Distribution of observed values, such as latencies, in fixed buckets"""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.bounds = tuple(sorted(float(bound) for bound in buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.bounds)
+
+    def observe(self, value):
+        self._default.observe(value)
+
+    def time(self):
+        return self._default.time()
+
+    def samples(self):
+        for values, child in self.children():
+            cumulative, total, count = child.get()
+            for bound, running in zip(self.bounds + (math.inf,), cumulative):
+                yield '_bucket', values, (('le', _format_value(bound)),), running
+            yield '_sum', values, (), total
+            yield '_count', values, (), count
+
+
+# MetricsRegistry collects metric families and renders them for a scrape.
+# Values that already live elsewhere (cache counters, pool sizes) are not
+# mirrored on every change; a collector callback reads them at scrape time.
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f'Metric {metric.name} is already registered differently')
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def add_collector(self, collector):
+        """
+        Add a callback run on every scrape
+
+        Args:
+            collector (callable): Returns a list of metrics with their current
+                values, built fresh for the scrape
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def expose(self):
+        """
+        Render all metrics in the Prometheus text exposition format
+
+        Returns:
+            str: Exposition text, version 0.0.4
+        """
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        for collector in collectors:
+            metrics.extend(collector())
+        return '\n'.join(metric.expose() for metric in metrics) + '\n'
+
+
+# Content type of the text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REGISTRY = MetricsRegistry()
+
+# Metrics shared by the services and the web app. The stage label is one of
+# parse, detect, translate_upstream, synthesize or playback.
+STAGE_SECONDS = REGISTRY.histogram(
+    'translator_stage_duration_seconds', 'Time spent in each processing stage', ('stage',)
+)
+STAGE_IN_FLIGHT = REGISTRY.gauge(
+    'translator_stage_in_flight', 'Operations currently running in each stage', ('stage',)
+)
+STAGE_ERRORS = REGISTRY.counter(
+    'translator_stage_errors_total', 'Failed operations per stage', ('stage',)
+)
+UPSTREAM_ERRORS = REGISTRY.counter(
+    'translator_upstream_errors_total', 'Failed upstream translation calls by failure type', ('type',)
+)
+UPSTREAM_EVENTS = REGISTRY.counter(
+    'translator_upstream_events_total',
+    'Hedged, retried, deadline-exceeded and short-circuited upstream calls', ('event',)
+)
+UPSTREAM_LIMIT = REGISTRY.gauge(
+    'translator_upstream_concurrency_limit', 'Adaptive limit of upstream calls in flight'
+)
+UPSTREAM_CIRCUIT_OPEN = REGISTRY.gauge(
+    'translator_upstream_circuit_open', '1 while the circuit breaker rejects upstream calls'
+)
+HTTP_REQUESTS = REGISTRY.counter(
+    'translator_http_requests_total', 'HTTP requests by endpoint and status code', ('endpoint', 'status')
+)
+HTTP_IN_FLIGHT = REGISTRY.gauge(
+    'translator_http_requests_in_flight', 'HTTP requests currently being handled'
+)
+
+
+# Stage tracks one stage in the shared metrics: its latency histogram,
+# in-flight gauge and error counter, bound once so `with stage.time():` costs
+# three short lock acquisitions and no dictionary lookups.
+class Stage:
+    __slots__ = ('seconds', 'in_flight', 'errors')
+
+    def __init__(self, name):
+        self.seconds = STAGE_SECONDS.labels(name)
+        self.in_flight = STAGE_IN_FLIGHT.labels(name)
+        self.errors = STAGE_ERRORS.labels(name)
+
+    def observe(self, seconds, failed=False):
+        """Record an operation timed by the caller"""
+        self.seconds.observe(seconds)
+        if failed:
+            self.errors.inc()
+
+    def time(self):
+        """Context manager that records the duration and failure of a code block"""
+        return _StageTimer(self)
+
+
+class _StageTimer:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.stage.in_flight.inc()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        stage = self.stage
+        stage.seconds.observe(time.perf_counter() - self.start)
+        stage.in_flight.dec()
+        if exc_type is not None:
+            stage.errors.inc()
+
+    def fail(self):
+        """Count the block as failed although it did not raise"""
+        self.stage.errors.inc()
+
+
+PARSE = Stage('parse')
+DETECT = Stage('detect')
+TRANSLATE_UPSTREAM = Stage('translate_upstream')
+SYNTHESIZE = Stage('synthesize')
+PLAYBACK = Stage('playback')
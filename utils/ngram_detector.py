@@ -0,0 +1,232 @@
+from langdetect import detector_factory
+from langdetect.detector import Detector
+from langdetect.lang_detect_exception import ErrorCode, LangDetectException
+from langdetect.utils.ngram import NGram
+from collections import Counter
+import re
+import threading
+import numpy as np
+
+_LATIN = re.compile(r'[A-z]')
+# Characters langdetect counts as non-Latin when deciding whether to drop Latin text
+_NON_LATIN = re.compile(r'[\u0300-\u1dff\u1f00-\U0010ffff]')
+
+# NGramLanguageModel scores text against langdetect's language profiles with NumPy.
+# The profiles are loaded once into a dense (n-gram x language) matrix of log
+# probabilities. A text is reduced to the row indices of its n-grams and scored
+# for all languages at once by summing those rows, instead of langdetect's
+# randomized per-n-gram updates in Python. Feature extraction produces the same
+# n-grams as langdetect, but normalizes characters with one str.translate call
+# and extracts n-grams once per distinct word instead of once per character.
+class NGramLanguageModel:
+    # Smoothing added to every n-gram probability; the same value langdetect
+    # uses (ALPHA_DEFAULT / BASE_FREQ)
+    SMOOTHING = 0.5 / 10000
+    # Upper bound of characters fed to feature extraction in one call
+    MAX_TEXT_LENGTH = 10000
+    # Texts longer than SAMPLE_CHARS are scored on evenly spread segments of
+    # SEGMENT_CHARS characters, stopping early once the leading language has
+    # reached STOP_CONFIDENCE on two consecutive segments
+    SAMPLE_CHARS = 4000
+    SEGMENT_CHARS = 500
+    STOP_CONFIDENCE = 0.99
+    # N-grams of one text are far from independent, so the naive Bayes
+    # posterior is overconfident. Scores of N n-grams are scaled by
+    # sqrt(EVIDENCE_SCALE / N), which matches confidence to accuracy on the
+    # labelled benchmark samples
+    EVIDENCE_SCALE = 4.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._normalize_table = None
+        self.languages = None
+        self.ngram_index = None
+        self.log_probs = None
+
+    def load(self):
+        """Build the profile matrix on first use"""
+        if self.log_probs is not None:
+            return
+        with self._lock:
+            if self.log_probs is not None:
+                return
+            detector_factory.init_factory()
+            factory = detector_factory._factory
+
+            ngrams = list(factory.word_lang_prob_map)
+            probs = np.array([factory.word_lang_prob_map[ngram] for ngram in ngrams], dtype=np.float64)
+
+            self._normalize_table = ''.join(NGram.normalize(chr(code_point)) for code_point in range(0x10000))
+            self.languages = list(factory.langlist)
+            self.ngram_index = {ngram: row for row, ngram in enumerate(ngrams)}
+            self.log_probs = np.log(probs + self.SMOOTHING).astype(np.float32)
+
+    def _prepare_text(self, text):
+        """Apply langdetect's text cleaning and character normalization"""
+        # Bound the regex work on huge inputs; cleaning only shortens text
+        text = Detector.URL_RE.sub(' ', text[:self.MAX_TEXT_LENGTH * 2])
+        text = Detector.MAIL_RE.sub(' ', text)
+        text = NGram.normalize_vi(text)[:self.MAX_TEXT_LENGTH]
+
+        # Drop Latin letters from text that is mostly written in another script
+        if len(_LATIN.findall(text)) * 2 < len(_NON_LATIN.findall(text)):
+            text = _LATIN.sub('', text)
+
+        return text.translate(self._normalize_table)
+
+    @staticmethod
+    def _word_ngrams(word, closed):
+        """All 1- to 3-grams langdetect extracts from one word"""
+        padded = ' ' + word + ' ' if closed else ' ' + word
+        ngrams = []
+        for end in range(1, len(padded)):
+            # langdetect skips positions inside all-capital words
+            if padded[end].isupper() and padded[end - 1].isupper():
+                continue
+            for n in (1, 2, 3):
+                if n > end + 1:
+                    break
+                ngram = padded[end - n + 1:end + 1]
+                if ngram != ' ':
+                    ngrams.append(ngram)
+        return ngrams
+
+    def extract_features(self, text):
+        """
+        Extract the known n-grams of text with their number of occurrences
+
+        Returns:
+            tuple: (row indices into the profile matrix, occurrence counts) as arrays
+        """
+        self.load()
+        words = self._prepare_text(text).split(' ')
+        last = words.pop() if words else ''
+
+        index = self.ngram_index
+        counts = Counter()
+        for word, occurrences in Counter(word for word in words if word).items():
+            for ngram in self._word_ngrams(word, True):
+                row = index.get(ngram)
+                if row is not None:
+                    counts[row] += occurrences
+        if last:
+            for ngram in self._word_ngrams(last, False):
+                row = index.get(ngram)
+                if row is not None:
+                    counts[row] += 1
+
+        rows = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        weights = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        return rows, weights
+
+    def score(self, rows, weights):
+        """
+        Sum the weighted log probabilities of n-gram rows for every language
+
+        Returns:
+            numpy.ndarray: One log-likelihood per language
+        """
+        return weights @ self.log_probs[rows].astype(np.float64)
+
+    def sample_segments(self, text):
+        """
+        Pick evenly spread segments of a long text
+
+        Segments are cut at spaces where possible and ordered from the outside
+        in (first, last, second, second to last, ...) so early stopping sees
+        different parts of the text first.
+
+        Returns:
+            list: The whole text if it is short, otherwise its sampled segments
+        """
+        if len(text) <= self.SAMPLE_CHARS:
+            return [text]
+
+        count = self.SAMPLE_CHARS // self.SEGMENT_CHARS
+        stride = (len(text) - self.SEGMENT_CHARS) / (count - 1)
+        segments = []
+        for i in range(count):
+            start = int(i * stride)
+            if start:
+                space = text.find(' ', start, start + 50)
+                if space != -1:
+                    start = space + 1
+            end = start + self.SEGMENT_CHARS
+            space = text.rfind(' ', end - 50, end)
+            if space > start:
+                end = space
+            segments.append(text[start:end])
+
+        order = []
+        low, high = 0, count - 1
+        while low <= high:
+            order.append(low)
+            if high != low:
+                order.append(high)
+            low, high = low + 1, high - 1
+        return [segments[i] for i in order]
+
+    def _posterior(self, scores, evidence):
+        """Turn summed log-likelihoods of `evidence` n-grams into probabilities"""
+        scaled = scores * min(1.0, np.sqrt(self.EVIDENCE_SCALE / evidence))
+        scaled -= scaled.max()
+        probs = np.exp(scaled)
+        return probs / probs.sum()
+
+    def probabilities(self, text):
+        """
+        Calibrated probability of every language for text
+
+        Long texts are scored on a bounded sample of segments, so the cost does
+        not depend on the input size.
+
+        Returns:
+            numpy.ndarray: Probabilities aligned with `self.languages`
+
+        Raises:
+            LangDetectException: If text has no usable n-grams
+        """
+        self.load()
+        scores = np.zeros(len(self.languages))
+        evidence = 0.0
+        leader = None
+        for segment in self.sample_segments(text):
+            rows, weights = self.extract_features(segment)
+            if not len(rows):
+                continue
+            scores += self.score(rows, weights)
+            evidence += weights.sum()
+
+            probs = self._posterior(scores, evidence)
+            top = int(np.argmax(probs))
+            if top == leader and probs[top] >= self.STOP_CONFIDENCE:
+                return probs
+            leader = top
+
+        if not evidence:
+            raise LangDetectException(ErrorCode.CantDetectError, 'No features in text.')
+        return self._posterior(scores, evidence)
+
+    def rank(self, text, top_k=3):
+        """
+        Return the most likely languages with their probabilities
+
+        Returns:
+            list: (language code, probability) tuples, most likely first
+
+        Raises:
+            LangDetectException: If text has no usable n-grams
+        """
+        probs = self.probabilities(text)
+        top = np.argsort(probs)[::-1][:top_k]
+        return [(self.languages[i], float(probs[i])) for i in top]
+
+    def detect(self, text):
+        """
+        Return the code of the most likely language
+
+        Raises:
+            LangDetectException: If text has no usable n-grams
+        """
+        probs = self.probabilities(text)
+        return self.languages[int(np.argmax(probs))]
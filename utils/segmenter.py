@@ -0,0 +1,131 @@
+from collections import namedtuple
+import re
+
+# A piece of text and the whitespace that followed it in the original input.
+# Joining `text + separator` over all segments gives back the original string.
+Segment = namedtuple('Segment', ['text', 'separator'])
+
+# Sentence boundaries for the scripts we translate:
+# - Latin/Cyrillic/Greek end punctuation, optionally followed by closing quotes,
+#   counts only when whitespace follows ("3.14" and "e.g.x" are not split)
+# - CJK full-width stops end a sentence without any following space
+# - Devanagari danda, Arabic question mark, Urdu full stop, Myanmar and Ethiopic
+#   sentence marks
+# - Thai has no sentence punctuation; a space between Thai characters separates
+#   sentences or phrases
+# - Line breaks always end a segment so paragraphs are kept apart
+_BOUNDARY = re.compile(
+    r'[.!?\u2026\u037e]+[\'"\u201d\u2019)\]\u00bb]*(?=\s|$)'
+    r'|[\u3002\uff01\uff1f\uff1b\uff61]+[\u300d\u300f\uff09\u3011"\u201d\u2019]*'
+    r'|[\u0964\u0965\u061f\u06d4\u104a\u104b\u1362\u1367]+'
+    r'|(?<=[\u0e00-\u0e7f])(?=[ \t\u00a0]+[\u0e00-\u0e7f])'
+    r'|(?=\n)'
+)
+_WHITESPACE = re.compile(r'\s*')
+_TRAILING_WHITESPACE = re.compile(r'\s*$')
+
+
+def split_sentences(text):
+    """
+    Split text into sentences, keeping the whitespace between them
+
+    Leading whitespace of the input is returned as a segment with empty text.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: Segment tuples in input order
+    """
+    segments = []
+    leading = _WHITESPACE.match(text).group()
+    if leading:
+        segments.append(Segment('', leading))
+
+    start = len(leading)
+    for match in _BOUNDARY.finditer(text, start):
+        end = match.end()
+        if end <= start:
+            continue
+        separator = _WHITESPACE.match(text, end).group()
+        body = text[start:end]
+        sentence = body.rstrip()
+        segments.append(Segment(sentence, body[len(sentence):] + separator))
+        start = end + len(separator)
+
+    if start < len(text):
+        rest = text[start:]
+        separator = _TRAILING_WHITESPACE.search(rest).group()
+        segments.append(Segment(rest[:len(rest) - len(separator)], separator))
+
+    return segments
+
+
+def _split_long(segment, max_chars):
+    """Cut a segment longer than max_chars at whitespace, or hard if there is none"""
+    pieces = []
+    text = segment.text
+    while len(text) > max_chars:
+        cut = text.rfind(' ', 0, max_chars + 1)
+        head = text[:cut].rstrip() if cut > 0 else ''
+        if not head:
+            head = text[:max_chars].rstrip()
+        rest = text[len(head):]
+        separator = _WHITESPACE.match(rest).group()
+        pieces.append(Segment(head, separator))
+        text = rest[len(separator):]
+    pieces.append(Segment(text, segment.separator))
+    return pieces
+
+
+def chunk_text(text, max_chars=1500):
+    """
+    Split text into chunks of whole sentences under a size budget
+
+    Consecutive sentences and lines are packed together until the budget is
+    reached, keeping the whitespace and line breaks between them inside the
+    chunk. Sentences longer than the budget are split at whitespace.
+
+    Args:
+        text (str): Text to split
+        max_chars (int): Maximum number of characters per chunk
+
+    Returns:
+        list: Segment tuples whose text is at most max_chars long
+    """
+    chunks = []
+    current = None
+    for sentence in split_sentences(text):
+        if not sentence.text:
+            chunks.append(sentence)
+            continue
+
+        for piece in _split_long(sentence, max_chars):
+            if current is not None:
+                size = len(current.text) + len(current.separator) + len(piece.text)
+                if size <= max_chars:
+                    current = Segment(current.text + current.separator + piece.text, piece.separator)
+                    continue
+                chunks.append(current)
+            current = piece
+
+    if current is not None:
+        chunks.append(current)
+    return chunks
+
+
+def join_segments(segments, translations):
+    """
+    Reassemble translated segments with the original whitespace
+
+    Args:
+        segments (list): Segment tuples as returned by split_sentences or chunk_text
+        translations (list): Translated text for every segment, in the same order
+
+    Returns:
+        str: Joined text
+    """
+    return ''.join(
+        (translated if segment.text else '') + segment.separator
+        for segment, translated in zip(segments, translations)
+    )
@@ -0,0 +1,120 @@
+import asyncio
+import threading
+
+# SingleFlight coalesces concurrent calls that share a key.
+# The first caller for a key runs the function; callers arriving while it is
+# still running wait for it and receive the same result (or exception) instead
+# of starting their own call. Nothing is kept once the call finishes, so
+# coalescing never serves stale data. Works from threads (`do`) and from
+# coroutines on an event loop (`ado`). When the coroutine running the call is
+# cancelled, its waiters are not: one of them takes over and runs the call.
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._async_calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func):
+        """
+        Run func once for all concurrent callers with the same key
+
+        Args:
+            key: Hashable key identifying the call
+            func (callable): Function without arguments
+
+        Returns:
+            tuple: (result of func, True if this caller shared another caller's call)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def ado(self, key, coro_func):
+        """
+        Await coro_func() once for all concurrent coroutines with the same key
+
+        Args:
+            key: Hashable key identifying the call
+            coro_func (callable): Function without arguments returning an awaitable
+
+        Returns:
+            tuple: (result of the awaitable, True if this caller shared another call)
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (loop, key)
+        while True:
+            future = self._async_calls.get(flight_key)
+            if future is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(future), True
+            except _LeaderCancelled:
+                # The caller running the call was cancelled; join or run it again
+                self.coalesced -= 1
+
+        future = self._async_calls[flight_key] = loop.create_future()
+        self.executed += 1
+        try:
+            result = await coro_func()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result, False
+        finally:
+            del self._async_calls[flight_key]
+
+    def stats(self):
+        """Return how many calls ran and how many were coalesced onto them"""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                'in_flight': len(self._calls) + len(self._async_calls),
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'coalesced_ratio': self.coalesced / total if total else 0.0,
+            }
+
+
+class _LeaderCancelled(Exception):
+    """The coroutine running a shared call was cancelled before it finished"""
+
+
+class _Call:
+    """State of one in-flight call shared by its waiters"""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
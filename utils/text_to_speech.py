@@ -1,51 +1,115 @@
+from .audio_player import get_audio_player
+from .segmenter import chunk_text
+from .singleflight import SingleFlight
+from .tts_cache import AudioCache
+from . import metrics
+from concurrent.futures import ThreadPoolExecutor
 from gtts import gTTS
-import pygame
 import io
-import tempfile
 import os
-import logging
 import time
-import threading
+import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # The TextToSpeech class handles text-to-speech conversion using gTTS and plays the audio using pygame.
-# It manages temporary audio files and provides functionality to stop currently playing audio.
+# Long texts are split at sentence boundaries and the chunks are synthesized concurrently;
+# playback starts as soon as the first chunk is ready and the following chunks are queued
+# behind it by a single long-lived AudioPlayer worker.
+# Synthesized audio is kept in an on-disk AudioCache, so replaying a text is a local file read.
+# With TTS_AUDIO=0 pygame is never imported, and on machines without an audio device the
+# mixer fails to start; synthesis works either way and only local playback is disabled.
 class TextToSpeech:
-    def __init__(self):
-        # Initialize pygame mixer for audio playback
-        pygame.mixer.init()
-        self.is_playing = False
-        self.temp_files = []
-    
-    def __del__(self):
-        # Clean up temporary files when object is destroyed
-        self.cleanup_temp_files()
+    def __init__(self, audio_cache=None, audio=None):
+        """
+        Args:
+            audio_cache (AudioCache, optional): Cache of synthesized audio
+            audio (bool, optional): Enable local playback. Defaults to the TTS_AUDIO
+                environment variable, which is on unless set to 0
+        """
+        if audio is None:
+            audio = os.environ.get('TTS_AUDIO', '1').lower() not in ('0', 'false', 'no', 'off')
+        self.player = None
+        if audio:
+            self._init_audio()
+        self.audio_cache = audio_cache if audio_cache is not None else AudioCache()
+        self.single_flight = SingleFlight()
+        
+        # Characters per synthesized chunk and chunks synthesized at once
+        self.chunk_chars = 200
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=4)
         
-    def cleanup_temp_files(self):
-        """Remove temporary audio files"""
-        for file_path in self.temp_files:
-            try:
-                if os.path.exists(file_path):
-                    os.remove(file_path)
-            except Exception as e:
-                logger.error(f"Failed to delete temporary file {file_path}: {str(e)}")
-        self.temp_files = []
+    def _init_audio(self):
+        """Start the audio player that owns the pygame mixer"""
+        try:
+            self.player = get_audio_player()
+        except Exception as e:
+            logger.warning(f"Audio playback unavailable, running without sound: {str(e)}")
+            
+    @property
+    def audio_enabled(self):
+        """Whether audio can be played on this machine"""
+        return self.player is not None
+        
+    @property
+    def is_playing(self):
+        """Whether audio is currently playing"""
+        return self.player is not None and self.player.is_playing
         
     def stop_audio(self):
         """Stop any currently playing audio"""
-        if pygame.mixer.get_busy():
-            pygame.mixer.music.stop()
-        self.is_playing = False
+        if self.player is not None:
+            self.player.stop()
+        
+    def get_cache_stats(self):
+        """Return statistics of the audio cache"""
+        return self.audio_cache.stats()
         
-    def text_to_speech_memory(self, text, lang='en'):
+    def synthesize(self, text, lang='en', slow=False):
+        """
+        Return MP3 audio for text, from the audio cache or from gTTS
+        
+        Args:
+            text (str): Text to convert to speech
+            lang (str): Language code for TTS
+            slow (bool): Whether to use the slow speaking rate
+            
+        Returns:
+            bytes: MP3 data
+        """
+        audio = self.audio_cache.get(text, lang, slow)
+        if audio is not None:
+            return audio
+            
+        # Concurrent requests for the same clip share one synthesis
+        key = self.audio_cache.make_key(text, lang, slow)
+        audio, _ = self.single_flight.do(key, lambda: self._synthesize_uncached(text, lang, slow))
+        return audio
+        
+    def _synthesize_uncached(self, text, lang, slow):
+        """Synthesize text with gTTS and store the audio in the cache"""
+        with metrics.SYNTHESIZE.time():
+            tts = gTTS(text=text, lang=lang, slow=slow)
+            mp3_fp = io.BytesIO()
+            tts.write_to_fp(mp3_fp)
+            audio = mp3_fp.getvalue()
+        
+        self.audio_cache.put(text, lang, audio, slow)
+        return audio
+        
+    def text_to_speech_memory(self, text, lang='en', on_complete=None):
         """
         Convert text to speech and play it directly from memory
         
+        Playback starts once the first sentence chunk is synthesized; the rest
+        is synthesized in the background and queued behind it.
+        
         Args:
             text (str): Text to convert to speech
             lang (str): Language code for TTS
+            on_complete (callable, optional): Called from the playback thread with
+                True when playback has finished or False when it failed midway
             
         Returns:
             bool: True if successful, False otherwise
@@ -54,41 +118,31 @@ class TextToSpeech:
             logger.warning("Empty text provided for TTS")
             return False
             
-        try:
-            # Stop any currently playing audio
-            self.stop_audio()
-            
-            # Create gTTS object
-            tts = gTTS(text=text, lang=lang, slow=False)
-            
-            # Save to in-memory file-like object
-            mp3_fp = io.BytesIO()
-            tts.write_to_fp(mp3_fp)
-            mp3_fp.seek(0)
-            
-            # Create a temporary file
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as temp_file:
-                temp_file.write(mp3_fp.read())
-                temp_path = temp_file.name
-                
-            # Keep track of the temporary file to delete it later
-            self.temp_files.append(temp_path)
-            
-            # Play the audio
-            pygame.mixer.music.load(temp_path)
-            pygame.mixer.music.play()
-            self.is_playing = True
-            
-            # Start a thread to monitor when playback ends
-            def check_if_playing():
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
-                self.is_playing = False
-                
-            threading.Thread(target=check_if_playing, daemon=True).start()
-            
-            return True
+        if not self.audio_enabled:
+            logger.warning("Audio playback is disabled")
+            return False
             
+        # Stop any currently playing audio
+        self.stop_audio()
+        
+        chunks = [chunk.text for chunk in chunk_text(text, self.chunk_chars) if chunk.text]
+        futures = [self.synthesis_pool.submit(self.synthesize, chunk, lang) for chunk in chunks]
+        
+        try:
+            # Report failures of the first chunk to the caller
+            futures[0].result()
         except Exception as e:
+            for future in futures:
+                future.cancel()
             logger.error(f"TTS error: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+            
+        started = time.perf_counter()
+        
+        def finished(success):
+            metrics.PLAYBACK.observe(time.perf_counter() - started, failed=not success)
+            if on_complete is not None:
+                on_complete(success)
+                
+        self.player.play(futures, finished)
+        return True
@@ -0,0 +1,334 @@
+from .cache import TranslationCache
+from collections import deque
+from difflib import SequenceMatcher
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_TOKEN = re.compile(r'\w+|[^\w\s]')
+_NUMBER = re.compile(r'\d+')
+_SENTENCE_END = frozenset('.!?')
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS segments (
+    id INTEGER PRIMARY KEY,
+    source_lang TEXT NOT NULL,
+    target_lang TEXT NOT NULL,
+    source TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    detected_lang TEXT,
+    skeleton TEXT NOT NULL,
+    gram_count INTEGER NOT NULL,
+    UNIQUE (source_lang, target_lang, source)
+);
+CREATE INDEX IF NOT EXISTS segments_by_skeleton ON segments (source_lang, target_lang, skeleton);
+CREATE TABLE IF NOT EXISTS grams (
+    gram TEXT NOT NULL,
+    segment_id INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS grams_by_gram ON grams (gram, segment_id);
+CREATE TABLE IF NOT EXISTS gram_frequency (
+    gram TEXT PRIMARY KEY,
+    segments INTEGER NOT NULL
+) WITHOUT ROWID;
+'''
+
+# TranslationMemory is a persistent SQLite store of past segment translations
+# per language pair. Segments that differ only in numbers share a skeleton (the
+# text with every number replaced by 0), which is looked up directly. Beyond that
+# every source segment is indexed by its distinct character trigrams in an
+# inverted index. A segment similar enough to the query must share at least one
+# of the query's rarest trigrams (prefix filtering), so candidates come from the
+# short postings of those trigrams only and the store is never scanned. The
+# candidates sharing the most of them are ranked by Dice similarity of their
+# trigram sets. An identical segment is served as is; a similar one is adapted
+# when the two sources differ only in numbers or names (capitalized words not
+# starting a sentence) that appear exactly once in the stored translation, which
+# are then swapped. Ordinary words are never swapped, since a word the source
+# shares with the translation (train, hotel, menu) is still translated.
+# Anything else is left to the upstream.
+# Each process opens its own connection on first use, so the memory can be shared
+# by forked server workers; WAL mode lets them read while one of them writes.
+class TranslationMemory:
+    def __init__(self, path, threshold=0.7, max_candidates=5, max_scored=50, max_segment_chars=500):
+        """
+        Args:
+            path (str): SQLite database file
+            threshold (float): Minimum Dice similarity of trigram sets for a candidate
+            max_candidates (int): Most similar candidates checked for adaptation
+            max_scored (int): Candidates from the inverted index that are scored
+            max_segment_chars (int): Longer segments are neither stored nor looked up
+        """
+        self.path = path
+        self.threshold = threshold
+        self.max_candidates = max_candidates
+        self.max_scored = max_scored
+        self.max_segment_chars = max_segment_chars
+
+        self._lock = threading.Lock()
+        self._connection = None
+        self._pid = None
+        self._latencies = deque(maxlen=1000)
+
+        self.exact_hits = 0
+        self.adapted_hits = 0
+        self.misses = 0
+
+    def _connect(self):
+        """Return this process' connection, opening it on first use"""
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.execute('PRAGMA synchronous=NORMAL')
+            connection.executescript(_SCHEMA)
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    @staticmethod
+    def _normalize(text):
+        return TranslationCache.normalize_text(text)
+
+    @staticmethod
+    def _skeleton(text):
+        return _NUMBER.sub('0', text)
+
+    @staticmethod
+    def _grams(text):
+        """Distinct character trigrams of a normalized segment"""
+        padded = f" {text.lower()} "
+        return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+    @staticmethod
+    def _is_placeholder(tokens, index):
+        """
+        Whether a token is copied unchanged into translations: a number or a
+        capitalized name that does not start a sentence. Ordinary words are
+        translated, even when the stored translation happens to share them.
+        """
+        token = tokens[index]
+        if any(char.isdigit() for char in token):
+            return True
+        if not token[:1].isupper():
+            return False
+        return index > 0 and tokens[index - 1] not in _SENTENCE_END
+
+    @classmethod
+    def adapt(cls, old_source, new_source, translation):
+        """
+        Adapt the translation of old_source to new_source
+
+        Works when the sources differ only in replaced placeholder tokens
+        (numbers, names), one for one, and every replaced token occurs exactly
+        once in the translation.
+
+        Returns:
+            str: Adapted translation or None if the difference cannot be mapped
+        """
+        old_tokens = _TOKEN.findall(old_source)
+        new_tokens = _TOKEN.findall(new_source)
+        replacements = {}
+        matcher = SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == 'equal':
+                continue
+            if tag != 'replace' or i2 - i1 != j2 - j1:
+                return None
+            for i, j in zip(range(i1, i2), range(j1, j2)):
+                if not (cls._is_placeholder(old_tokens, i) and cls._is_placeholder(new_tokens, j)):
+                    return None
+                if replacements.setdefault(old_tokens[i], new_tokens[j]) != new_tokens[j]:
+                    return None
+
+        if not replacements:
+            return translation
+
+        patterns = {}
+        for old in replacements:
+            pattern = re.escape(old)
+            if re.match(r'\w', old):
+                pattern = rf'(?<!\w){pattern}(?!\w)'
+            if len(re.findall(pattern, translation)) != 1:
+                return None
+            patterns[old] = pattern
+
+        combined = re.compile('|'.join(f'({pattern})' for pattern in patterns.values()))
+        olds = list(patterns)
+        return combined.sub(lambda match: replacements[olds[match.lastindex - 1]], translation)
+
+    def lookup(self, text, target_lang, source_lang=None):
+        """
+        Find a stored translation for text, exact or adapted from a similar segment
+
+        Returns:
+            tuple: (translated text, detected language, 'exact' or 'adapted') or None
+        """
+        source = self._normalize(text)
+        if not source or len(source) > self.max_segment_chars:
+            return None
+
+        start = time.perf_counter()
+        pair = ((source_lang or 'auto').lower(), target_lang.lower())
+        try:
+            match = self._lookup(source, pair)
+        except sqlite3.Error as e:
+            logger.error(f"Translation memory lookup error: {str(e)}")
+            match = None
+
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+            if match is None:
+                self.misses += 1
+            elif match[2] == 'exact':
+                self.exact_hits += 1
+            else:
+                self.adapted_hits += 1
+        return match
+
+    def _lookup(self, source, pair):
+        grams = self._grams(source)
+        count = len(grams)
+        # Dice >= t bounds the other segment's size b to [low, high] and needs
+        # t*(a+b)/2 shared grams, at least min_shared. Of any count-min_shared+1
+        # grams of the query, one must be shared: the rarest ones are probed.
+        low = count * self.threshold / (2 - self.threshold)
+        high = count * (2 - self.threshold) / self.threshold
+        min_shared = max(1, math.ceil(self.threshold * (count + low) / 2))
+        probes = count - min_shared + 1
+
+        with self._lock:
+            connection = self._connect()
+            exact = connection.execute(
+                'SELECT translation, detected_lang FROM segments '
+                'WHERE source_lang = ? AND target_lang = ? AND source = ?',
+                (*pair, source),
+            ).fetchone()
+            if exact is not None:
+                return exact[0], exact[1], 'exact'
+
+            rows = connection.execute(
+                'SELECT source, translation, detected_lang FROM segments '
+                'WHERE source_lang = ? AND target_lang = ? AND skeleton = ? LIMIT ?',
+                (*pair, self._skeleton(source), self.max_candidates),
+            ).fetchall()
+            for candidate_source, translation, detected_lang in rows:
+                adapted = self.adapt(candidate_source, source, translation)
+                if adapted is not None:
+                    return adapted, detected_lang, 'adapted'
+
+            frequency = dict(connection.execute(
+                f"SELECT gram, segments FROM gram_frequency WHERE gram IN ({','.join('?' * count)})",
+                tuple(grams),
+            ).fetchall())
+            # Grams never seen before are rarest of all and have no postings
+            rarest = sorted(grams, key=lambda gram: frequency.get(gram, 0))[:probes]
+            rarest = [gram for gram in rarest if gram in frequency]
+            if not rarest:
+                return None
+
+            rows = connection.execute(
+                f"SELECT s.source, s.translation, s.detected_lang FROM grams g "
+                f"JOIN segments s ON s.id = g.segment_id "
+                f"WHERE g.gram IN ({','.join('?' * len(rarest))}) "
+                f"AND s.source_lang = ? AND s.target_lang = ? AND s.gram_count BETWEEN ? AND ? "
+                f"GROUP BY g.segment_id ORDER BY COUNT(*) DESC LIMIT ?",
+                (*rarest, *pair, low, high, self.max_scored),
+            ).fetchall()
+
+        candidates = []
+        for candidate_source, translation, detected_lang in rows:
+            candidate_grams = self._grams(candidate_source)
+            score = 2 * len(grams & candidate_grams) / (count + len(candidate_grams))
+            if score >= self.threshold:
+                candidates.append((score, candidate_source, translation, detected_lang))
+        candidates.sort(key=lambda candidate: candidate[0], reverse=True)
+
+        for _, candidate_source, translation, detected_lang in candidates[:self.max_candidates]:
+            adapted = self.adapt(candidate_source, source, translation)
+            if adapted is not None:
+                return adapted, detected_lang, 'adapted'
+        return None
+
+    def add(self, text, translation, target_lang, source_lang=None, detected_lang=None):
+        """Store the translation of a segment, replacing an older one for the same pair"""
+        source = self._normalize(text)
+        if not source or len(source) > self.max_segment_chars:
+            return
+
+        grams = self._grams(source)
+        pair = ((source_lang or 'auto').lower(), target_lang.lower())
+        try:
+            with self._lock:
+                connection = self._connect()
+                with connection:
+                    row = connection.execute(
+                        'SELECT id FROM segments WHERE source_lang = ? AND target_lang = ? AND source = ?',
+                        (*pair, source),
+                    ).fetchone()
+                    if row is not None:
+                        connection.execute(
+                            'UPDATE segments SET translation = ?, detected_lang = ? WHERE id = ?',
+                            (translation, detected_lang, row[0]),
+                        )
+                        return
+                    segment_id = connection.execute(
+                        'INSERT INTO segments (source_lang, target_lang, source, translation, '
+                        'detected_lang, skeleton, gram_count) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (*pair, source, translation, detected_lang, self._skeleton(source), len(grams)),
+                    ).lastrowid
+                    connection.executemany(
+                        'INSERT INTO grams (gram, segment_id) VALUES (?, ?)',
+                        [(gram, segment_id) for gram in grams],
+                    )
+                    connection.executemany(
+                        'INSERT INTO gram_frequency (gram, segments) VALUES (?, 1) '
+                        'ON CONFLICT (gram) DO UPDATE SET segments = segments + 1',
+                        [(gram,) for gram in grams],
+                    )
+        except sqlite3.Error as e:
+            logger.error(f"Translation memory write error: {str(e)}")
+
+    def stats(self):
+        """Return the size of the memory, hit counters and lookup latency"""
+        with self._lock:
+            try:
+                segments = self._connect().execute('SELECT COUNT(*) FROM segments').fetchone()[0]
+            except sqlite3.Error:
+                segments = None
+            latencies = sorted(self._latencies)
+            exact_hits, adapted_hits, misses = self.exact_hits, self.adapted_hits, self.misses
+
+        size = 0
+        for suffix in ('', '-wal'):
+            try:
+                size += os.path.getsize(self.path + suffix)
+            except OSError:
+                pass
+
+        def percentile(fraction):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))] * 1000
+
+        lookups = exact_hits + adapted_hits + misses
+        return {
+            'path': self.path,
+            'segments': segments,
+            'bytes': size,
+            'exact_hits': exact_hits,
+            'adapted_hits': adapted_hits,
+            'misses': misses,
+            'hit_ratio': (exact_hits + adapted_hits) / lookups if lookups else 0.0,
+            'lookup_ms_p50': percentile(0.5),
+            'lookup_ms_p99': percentile(0.99),
+        }
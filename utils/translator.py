@@ -1,4 +1,10 @@
-from googletrans import Translator
+from .backends import GoogleTransBackend, classify_error
+from . import metrics
+from .cache import TranslationCache
+from .segmenter import chunk_text, join_segments
+from .singleflight import SingleFlight
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -7,9 +13,24 @@ logger = logging.getLogger(__name__)
 # This class provides translation service using Google Translate.
 # It uses the googletrans library to handle the translation.
 # googletrans is a AI language translation library that uses Google Translate API.
+# The upstream call goes through a TranslationBackend (see backends.py), so a
+# local fake can be swapped in for testing and benchmarking.
+# Successful results are kept in an in-memory LRU cache so repeated requests
+# do not go back to Google, and concurrent identical requests are coalesced
+# onto a single upstream call. An optional TranslationMemory keeps segment
+# translations across restarts and serves near-duplicates without the upstream.
 class TranslationService:
-    def __init__(self):
-        self.translator = Translator()
+    def __init__(self, backend=None, cache=None, max_concurrency=8, memory=None):
+        self.backend = backend if backend is not None else GoogleTransBackend()
+        self.cache = cache if cache is not None else TranslationCache()
+        self.memory = memory
+        self.single_flight = SingleFlight()
+        # Batch translation limits
+        self.max_concurrency = max_concurrency
+        self.pack_item_chars = 200
+        self.pack_max_chars = 4500
+        # Longer texts are split into sentence chunks of at most this size
+        self.chunk_chars = 1500
         # Languages supported by the translator
         self.languages = {
             'ar': 'Arabic', 'bg': 'Bulgarian',
@@ -34,11 +55,159 @@ class TranslationService:
     def get_languages(self):
         """Return dictionary of available languages"""
         return self.languages
+
+    def get_cache_stats(self):
+        """Return hit/miss/eviction counters of the result cache"""
+        return self.cache.stats()
+
+    def get_coalescing_stats(self):
+        """Return how many upstream calls were shared by concurrent identical requests"""
+        return self.single_flight.stats()
+
+    def get_memory_stats(self):
+        """Return size, hit counters and lookup latency of the translation memory"""
+        return self.memory.stats() if self.memory is not None else None
+    
+    # The steps of translate_text below are shared with AsyncTranslationService,
+    # which runs the same pipeline with async upstream calls: check_cache, then
+    # recall, then one upstream call or a chunked translation, then store.
+    def success_result(self, text, detected_lang, translated_text, target_lang):
+        """Build the result dictionary for a successful translation"""
+        return {
+            'original_text': text,
+            'detected_language': detected_lang,
+            'detected_language_name': self.languages.get(detected_lang, 'Unknown'),
+            'translated_text': translated_text,
+            'target_language': target_lang,
+            'target_language_name': self.languages.get(target_lang, 'Unknown'),
+            'success': True,
+            'error': None
+        }
+
+    def error_result(self, text, error):
+        """Build the result dictionary for a failed translation"""
+        return {
+            'original_text': text,
+            'detected_language': None,
+            'translated_text': '',
+            'success': False,
+            'error': error
+        }
+    
+    def upstream_error(self, text, error):
+        """Count and log a failed upstream call and build its result dictionary"""
+        metrics.UPSTREAM_ERRORS.labels(classify_error(error)).inc()
+        logger.error(f"Translation error: {str(error)}")
+        return self.error_result(text, str(error))
+    
+    def merge_chunk_results(self, text, chunks, results, target_lang):
+        """
+        Join the results of translating a text chunk by chunk
+        
+        Args:
+            text (str): The complete original text
+            chunks (list): Segments from chunk_text, including whitespace-only ones
+            results (list): Translation results for the chunks that have text
+            target_lang (str): Target language code
+            
+        Returns:
+            dict: Translation result for the complete text
+        """
+        for result in results:
+            if not result['success']:
+                return self.error_result(text, result['error'])
+        
+        translations = iter(result['translated_text'] for result in results)
+        translated_text = join_segments(chunks, [next(translations) if chunk.text else '' for chunk in chunks])
+        
+        # Report the language most chunks were detected as
+        detected_lang = Counter(result['detected_language'] for result in results).most_common(1)[0][0]
+        return self.success_result(text, detected_lang, translated_text, target_lang)
+    
+    def check_cache(self, text, target_lang, source_lang):
+        """
+        Reject empty text and look the translation up in the result cache
+
+        Returns:
+            tuple: (cache key, translation result or None on a cache miss)
+        """
+        if not text.strip():
+            return None, self.error_result(text, 'Empty text')
+        cache_key = self.cache.make_key(text, target_lang, source_lang)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            cached['original_text'] = text
+        return cache_key, cached
+    
+    def recall(self, text, target_lang, source_lang, cache_key):
+        """
+        Look text up in the translation memory and cache what it finds
+
+        Returns:
+            dict: Translation result or None if the memory has no usable match
+        """
+        if self.memory is None:
+            return None
+        match = self.memory.lookup(text, target_lang, source_lang)
+        if match is None:
+            return None
+        translated_text, detected_lang, _ = match
+        translation = self.success_result(text, detected_lang, translated_text, target_lang)
+        self.cache.set(cache_key, translation)
+        return translation
+
+    def store(self, text, translation, target_lang, source_lang, cache_key, segment=True):
+        """
+        Keep a new translation: successful results go to the cache and, for a
+        single upstream segment, to the translation memory
+
+        Args:
+            segment (bool): False for a text joined from chunks, whose chunks
+                were stored on their own
+        """
+        if not translation['success']:
+            return
+        self.cache.set(cache_key, translation)
+        if segment and self.memory is not None:
+            self.memory.add(
+                text, translation['translated_text'], target_lang, source_lang, translation['detected_language']
+            )
+
+    def _translate_chunked(self, text, target_lang, source_lang):
+        """Translate a long text as sentence chunks in parallel"""
+        chunks = chunk_text(text, self.chunk_chars)
+        pieces = [chunk.text for chunk in chunks if chunk.text]
+        
+        workers = max(1, min(self.max_concurrency, len(pieces)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda piece: self.translate_text(piece, target_lang, source_lang), pieces))
+        
+        return self.merge_chunk_results(text, chunks, results, target_lang)
+    
+    def _translate_upstream(self, text, target_lang, source_lang):
+        """Send one translation request to the backend"""
+        with metrics.TRANSLATE_UPSTREAM.time() as timer:
+            try:
+                # Perform translation
+                result = self.backend.translate(
+                    text,
+                    dest=target_lang,
+                    src=source_lang if source_lang else 'auto'
+                )
+                
+                return self.success_result(text, result.src, result.text, target_lang)
+                
+            except Exception as e:
+                timer.fail()
+                return self.upstream_error(text, e)
     
     def translate_text(self, text, target_lang='en', source_lang=None):
         """
         Translate text to target language
         
+        Texts longer than `chunk_chars` are split at sentence boundaries and the
+        chunks are translated concurrently.
+        
         Args:
             text (str): Text to translate
             target_lang (str): Target language code
@@ -47,40 +216,208 @@ class TranslationService:
         Returns:
             dict: Translation result with text, detected language, and translation
         """
-        if not text.strip():
-            return {
-                'original_text': text,
-                'detected_language': None,
-                'translated_text': '',
-                'success': False,
-                'error': 'Empty text'
-            }
+        # Serve repeated requests from the cache
+        cache_key, cached = self.check_cache(text, target_lang, source_lang)
+        if cached is not None:
+            return cached
+        
+        # Segments translated before (or nearly so) come from the translation memory
+        remembered = self.recall(text, target_lang, source_lang, cache_key)
+        if remembered is not None:
+            return remembered
+        
+        # Concurrent identical requests share one upstream call
+        translation, shared = self.single_flight.do(
+            cache_key, lambda: self._translate_uncached(text, target_lang, source_lang, cache_key)
+        )
+        if shared:
+            translation = dict(translation, original_text=text)
+        return translation
+    
+    def _translate_uncached(self, text, target_lang, source_lang, cache_key):
+        """Translate text upstream and store the result if it succeeded"""
+        if len(text) > self.chunk_chars:
+            translation = self._translate_chunked(text, target_lang, source_lang)
+            self.store(text, translation, target_lang, source_lang, cache_key, segment=False)
+        else:
+            translation = self._translate_upstream(text, target_lang, source_lang)
+            self.store(text, translation, target_lang, source_lang, cache_key)
+        return translation
+
+    def translate_stream(self, text, target_lang='en', source_lang=None):
+        """
+        Translate text and yield each chunk as soon as it is ready
+        
+        Chunks are translated concurrently and reported in completion order, so
+        callers place them by index. Whitespace-only segments are reported first.
+        A text no longer than `chunk_chars` is translated as one segment.
+        
+        Args:
+            text (str): Text to translate
+            target_lang (str): Target language code
+            source_lang (str, optional): Source language code. If None, auto-detect
             
+        Yields:
+            dict: A 'start' event with the number of segments, one 'segment' event
+            per segment and a final 'end' event with the overall result
+        """
+        cache_key, cached = self.check_cache(text, target_lang, source_lang)
+        if cache_key is None:
+            yield {'event': 'start', 'segments': 0}
+            yield dict(cached, event='end')
+            return
+        if cached is not None:
+            yield {'event': 'start', 'segments': 1}
+            yield {'event': 'segment', 'index': 0, 'translated_text': cached['translated_text'],
+                   'separator': '', 'success': True, 'error': None}
+            yield dict(cached, event='end')
+            return
+        
+        if len(text) <= self.chunk_chars:
+            # A short text is one upstream call anyway; going through translate_text
+            # keeps single-flight and the translation memory for the whole text
+            yield {'event': 'start', 'segments': 1}
+            result = self.translate_text(text, target_lang, source_lang)
+            yield {'event': 'segment', 'index': 0, 'translated_text': result['translated_text'],
+                   'separator': '', 'success': result['success'], 'error': result['error']}
+            yield dict(result, event='end')
+            return
+        
+        chunks = chunk_text(text, self.chunk_chars)
+        yield {'event': 'start', 'segments': len(chunks)}
+        
+        for index, chunk in enumerate(chunks):
+            if not chunk.text:
+                yield {'event': 'segment', 'index': index, 'translated_text': '',
+                       'separator': chunk.separator, 'success': True, 'error': None}
+        
+        pending = [(index, chunk) for index, chunk in enumerate(chunks) if chunk.text]
+        results = {}
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(pending))))
         try:
-            # Perform translation
-            result = self.translator.translate(
-                text,
-                dest=target_lang,
-                src=source_lang if source_lang else 'auto'
-            )
-            
-            return {
-                'original_text': text,
-                'detected_language': result.src,
-                'detected_language_name': self.languages.get(result.src, 'Unknown'),
-                'translated_text': result.text,
-                'target_language': target_lang,
-                'target_language_name': self.languages.get(target_lang, 'Unknown'),
-                'success': True,
-                'error': None
+            futures = {
+                executor.submit(self.translate_text, chunk.text, target_lang, source_lang): index
+                for index, chunk in pending
             }
+            for future in as_completed(futures):
+                index = futures[future]
+                result = future.result()
+                results[index] = result
+                yield {'event': 'segment', 'index': index, 'translated_text': result['translated_text'],
+                       'separator': chunks[index].separator, 'success': result['success'],
+                       'error': result['error']}
+        finally:
+            # Stop queued chunks if the consumer went away early
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        translation = self.merge_chunk_results(
+            text, chunks, [results[index] for index, _ in pending], target_lang
+        )
+        self.store(text, translation, target_lang, source_lang, cache_key, segment=False)
+        yield dict(translation, event='end')
+
+    def translate_batch(self, texts, target_lang='en', source_lang=None):
+        """
+        Translate many texts at once
+        
+        Identical inputs are translated once. When the source language is known,
+        short single-line texts are packed into newline separated upstream calls.
+        Everything else is translated with at most `max_concurrency` calls in flight.
+        
+        Args:
+            texts (list): Texts to translate
+            target_lang (str): Target language code
+            source_lang (str, optional): Source language code. If None, auto-detect
             
-        except Exception as e:
-            logger.error(f"Translation error: {str(e)}")
-            return {
-                'original_text': text,
-                'detected_language': None,
-                'translated_text': '',
-                'success': False,
-                'error': str(e)
-            }
\ No newline at end of file
+        Returns:
+            list: One translation result per input text, in input order
+        """
+        results = [None] * len(texts)
+        
+        # Group duplicate inputs under one cache key
+        groups = OrderedDict()
+        for index, text in enumerate(texts):
+            if not text.strip():
+                results[index] = self.error_result(text, 'Empty text')
+                continue
+            key = self.cache.make_key(text, target_lang, source_lang)
+            groups.setdefault(key, []).append(index)
+        
+        pending = []
+        for key, indices in groups.items():
+            cached = self.cache.get(key)
+            if cached is None:
+                pending.append(key)
+                continue
+            for index in indices:
+                results[index] = dict(cached, original_text=texts[index])
+        
+        # Short texts without line breaks can share one upstream call when the
+        # source language is fixed, since the upstream keeps lines apart. The
+        # translation memory is consulted first, as translate_text does for
+        # the texts sent alone
+        packs = []
+        singles = []
+        if source_lang:
+            current, current_size = [], 0
+            for key in pending:
+                text = texts[groups[key][0]]
+                if '\n' in text or len(text) > self.pack_item_chars:
+                    singles.append(key)
+                    continue
+                remembered = self.recall(text, target_lang, source_lang, key)
+                if remembered is not None:
+                    for index in groups[key]:
+                        results[index] = dict(remembered, original_text=texts[index])
+                    continue
+                if current and current_size + len(text) + 1 > self.pack_max_chars:
+                    packs.append(current)
+                    current, current_size = [], 0
+                current.append(key)
+                current_size += len(text) + 1
+            if current:
+                packs.append(current)
+        else:
+            singles = pending
+        
+        def translate_single(key):
+            return {key: self.translate_text(texts[groups[key][0]], target_lang, source_lang)}
+        
+        def translate_pack(keys):
+            if len(keys) == 1:
+                return translate_single(keys[0])
+            originals = [texts[groups[key][0]] for key in keys]
+            with metrics.TRANSLATE_UPSTREAM.time() as timer:
+                try:
+                    result = self.backend.translate('\n'.join(originals), dest=target_lang, src=source_lang)
+                    lines = result.text.split('\n')
+                except Exception as e:
+                    timer.fail()
+                    self.upstream_error('\n'.join(originals), e)
+                    lines = []
+            
+            # Fall back to one call per text if the upstream merged or split lines
+            if len(lines) != len(keys):
+                translated = {}
+                for key in keys:
+                    translated.update(translate_single(key))
+                return translated
+            
+            translated = {}
+            for key, original, line in zip(keys, originals, lines):
+                translation = self.success_result(original, result.src, line.strip(), target_lang)
+                self.store(original, translation, target_lang, source_lang, key)
+                translated[key] = translation
+            return translated
+        
+        jobs = [(translate_pack, keys) for keys in packs] + [(translate_single, key) for key in singles]
+        if jobs:
+            workers = max(1, min(self.max_concurrency, len(jobs)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(func, arg) for func, arg in jobs]
+                for future in futures:
+                    for key, translation in future.result().items():
+                        for index in groups[key]:
+                            results[index] = dict(translation, original_text=texts[index])
+        
+        return results
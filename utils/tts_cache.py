@@ -0,0 +1,165 @@
+from .cache import TranslationCache
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+_KEY = re.compile(r'[0-9a-f]{64}')
+
+# AudioCache stores synthesized MP3 files on disk, addressed by a hash of
+# (normalized text, language, slow). Files are written to a temporary name and
+# renamed into place, so readers in any process only ever see complete files.
+# A hit refreshes the file's modification time; when the directory grows past
+# `max_bytes` the least recently used files are removed. Several processes can
+# share one directory: a file that disappears under a reader is just a miss.
+class AudioCache:
+    # Temporary files older than this are left over from a crashed writer
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self, directory=None, max_bytes=256 * 1024 * 1024):
+        """
+        Args:
+            directory (str, optional): Cache directory. Defaults to TTS_CACHE_DIR
+                or a folder in the system temp directory
+            max_bytes (int): Disk size cap for all cached files
+        """
+        self.directory = directory or os.environ.get(
+            'TTS_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'ai_translator_tts_cache')
+        )
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._approx_bytes = None
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(text, lang, slow=False):
+        """Content hash identifying one synthesized clip"""
+        normalized = TranslationCache.normalize_text(text)
+        payload = f"{lang.lower()}\0{int(bool(slow))}\0{normalized}".encode('utf-8')
+        return hashlib.sha256(payload).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.mp3')
+
+    def get_path(self, key):
+        """
+        Return the file of a cached clip by its key, marking it as recently used
+
+        Args:
+            key (str): Key returned by make_key
+
+        Returns:
+            str: Path of the MP3 file or None if the key is invalid or not cached
+        """
+        if not _KEY.fullmatch(key):
+            return None
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def get(self, text, lang, slow=False):
+        """
+        Read a cached clip
+
+        Returns:
+            bytes: MP3 data or None on a miss
+        """
+        path = self._path(self.make_key(text, lang, slow))
+        try:
+            with open(path, 'rb') as audio_file:
+                data = audio_file.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, text, lang, data, slow=False):
+        """Store a clip atomically and enforce the size cap"""
+        path = self._path(self.make_key(text, lang, slow))
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as temp_file:
+                    temp_file.write(data)
+                os.replace(temp_path, path)
+            except BaseException:
+                os.remove(temp_path)
+                raise
+        except OSError as e:
+            logger.error(f"Failed to write TTS cache file {path}: {str(e)}")
+            return
+
+        with self._lock:
+            if self._approx_bytes is None:
+                self._approx_bytes = self._scan_size()
+            else:
+                self._approx_bytes += len(data)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def _entries(self):
+        """List (mtime, size, path) of all cached files and stale temporary files"""
+        entries = []
+        stale_before = time.time() - self.STALE_TEMP_SECONDS
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                # Another process may still be writing a recent temporary file
+                if name.endswith('.tmp') and stat.st_mtime > stale_before:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_size(self):
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self):
+        """Remove least recently used files until the cache fits in 90% of the cap"""
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                self.evictions += 1
+            except OSError:
+                pass
+            total -= size
+        self._approx_bytes = total
+
+    def stats(self):
+        """Return hit/miss/eviction counters and the approximate disk usage"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'directory': self.directory,
+                'bytes': self._approx_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,469 @@
+from .backends import (
+    CircuitOpenError, DeadlineExceeded, TranslationBackend, UpstreamStatusError, classify_error
+)
+from . import metrics
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import asyncio
+import random
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Failure types worth another attempt; translation requests are idempotent
+RETRYABLE_ERRORS = frozenset(['timeout', 'connection', 'http_5xx', 'injected'])
+
+
+def is_retryable(error):
+    """Whether an upstream failure is transient and the call may be repeated"""
+    if isinstance(error, UpstreamStatusError) and error.status_code == 429:
+        return True
+    return classify_error(error) in RETRYABLE_ERRORS
+
+
+# LatencyTracker keeps the latencies of the most recent successful calls and
+# answers percentile queries. The sorted copy is rebuilt at most every
+# `refresh` samples, so frequent queries stay cheap.
+class LatencyTracker:
+    def __init__(self, size=500, min_samples=20, refresh=10):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self._sorted = []
+        self._pending = 0
+        self.min_samples = min_samples
+        self.refresh = refresh
+
+    def add(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+            self._pending += 1
+
+    def percentile(self, fraction, default=None):
+        """
+        Return a latency percentile in seconds
+
+        Returns:
+            float: The percentile, or default while there are fewer than min_samples
+        """
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return default
+            if self._pending >= self.refresh or not self._sorted:
+                self._sorted = sorted(self._samples)
+                self._pending = 0
+            values = self._sorted
+        return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+# AdaptiveLimiter bounds the number of upstream calls in flight with an AIMD
+# rule, like TCP congestion control. It looks at a window of the most recent
+# calls: while their error rate stays below `max_error_rate` and their median
+# latency below `latency_tolerance` times the long-run median, every success
+# raises the limit by 1/limit (about +1 per round of calls). Otherwise the
+# upstream is taken to be overloaded and the limit is multiplied by `backoff`,
+# at most once per median round trip, so a single burst counts once. Isolated
+# slow calls and random failures do not shrink the limit. Both threads and
+# coroutines can wait for a free slot.
+class AdaptiveLimiter:
+    def __init__(self, initial=8, min_limit=1, max_limit=64, backoff=0.5, latency_tolerance=2.0,
+                 max_error_rate=0.25, window=20):
+        """
+        Args:
+            initial (int): Starting limit
+            min_limit (int): The limit never drops below this
+            max_limit (int): The limit never grows above this
+            backoff (float): Factor applied to the limit on congestion
+            latency_tolerance (float): Recent median latency above this multiple
+                of the long-run median counts as congestion
+            max_error_rate (float): Recent error rate above this counts as congestion
+            window (int): Number of recent calls looked at
+        """
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+        self.max_error_rate = max_error_rate
+        self.in_flight = 0
+        self._recent = deque(maxlen=window)
+        self._condition = threading.Condition()
+        self._async_waiters = deque()
+        self._last_decrease = 0.0
+        metrics.UPSTREAM_LIMIT.set(self.limit)
+
+    def _has_capacity(self):
+        return self.in_flight < int(self.limit)
+
+    def try_acquire(self):
+        """Take a slot if one is free right now"""
+        with self._condition:
+            if self._has_capacity():
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self, timeout):
+        """
+        Wait for a free slot
+
+        Returns:
+            bool: True if a slot was taken, False if the timeout passed first
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not self._has_capacity():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+            self.in_flight += 1
+            return True
+
+    async def aacquire(self, timeout):
+        """Wait for a free slot without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._condition:
+                if self._has_capacity():
+                    self.in_flight += 1
+                    return True
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, deadline - loop.time())
+            except asyncio.TimeoutError:
+                with self._condition:
+                    if (loop, waiter) in self._async_waiters:
+                        self._async_waiters.remove((loop, waiter))
+                    # A wake-up that raced with the timeout goes to the next waiter
+                    self._wake()
+                return False
+
+    def release(self, latency=None, failed=False, median=None):
+        """
+        Return a slot and adjust the limit
+
+        Args:
+            latency (float, optional): Duration of the call; None if it was abandoned
+            failed (bool): Whether the call failed in a way that can signal overload
+            median (float, optional): Long-run median latency of successful calls
+        """
+        with self._condition:
+            self.in_flight -= 1
+            if latency is not None:
+                self._recent.append((latency, failed))
+                if self._congested(median):
+                    now = time.monotonic()
+                    if now - self._last_decrease >= (median or 0.0):
+                        self.limit = max(self.min_limit, self.limit * self.backoff)
+                        self._last_decrease = now
+                        # Judge the new limit by calls made under it
+                        self._recent.clear()
+                elif not failed:
+                    self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+                metrics.UPSTREAM_LIMIT.set(self.limit)
+            self._wake()
+
+    def _congested(self, median):
+        """Whether the recent calls show an overloaded upstream; called with the condition held"""
+        if len(self._recent) < self._recent.maxlen // 2:
+            return False
+        failures = sum(1 for _, failed in self._recent if failed)
+        if failures > self.max_error_rate * len(self._recent):
+            return True
+        if median is None:
+            return False
+        latencies = sorted(latency for latency, _ in self._recent)
+        return latencies[len(latencies) // 2] > self.latency_tolerance * median
+
+    def _wake(self):
+        """Wake waiters for the free slots; called with the condition held"""
+        free = int(self.limit) - self.in_flight
+        if free <= 0:
+            return
+        self._condition.notify(free)
+        while free > 0 and self._async_waiters:
+            loop, waiter = self._async_waiters.popleft()
+            loop.call_soon_threadsafe(_resolve, waiter)
+            free -= 1
+
+
+def _resolve(waiter):
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+# CircuitBreaker stops sending calls to an upstream that keeps failing. After
+# `failure_threshold` consecutive failures it opens and rejects calls for
+# `reset_timeout` seconds, then lets a single probe through (half open): the
+# probe's success closes the circuit, its failure opens it again.
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, reset_timeout=10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may be sent now"""
+        with self._lock:
+            if self.state == 'closed':
+                return True
+            if self.state == 'open':
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self.state = 'half_open'
+            if self._probing:
+                return False
+            self._probing = True
+            return True
+
+    def abandon(self):
+        """Forget a call let through by allow() that was cancelled before its outcome"""
+        with self._lock:
+            self._probing = False
+
+    def record(self, success):
+        """Record the outcome of a call let through by allow()"""
+        with self._lock:
+            self._probing = False
+            if success:
+                self.failures = 0
+                self.state = 'closed'
+            else:
+                self.failures += 1
+                if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                    if self.state != 'open':
+                        logger.warning(f"Upstream circuit opened after {self.failures} failures")
+                    self.state = 'open'
+                    self._opened_at = time.monotonic()
+            metrics.UPSTREAM_CIRCUIT_OPEN.set(1 if self.state == 'open' else 0)
+
+
+# ManagedBackend wraps a TranslationBackend with the policies for calling an
+# unreliable upstream, so TranslationService and AsyncTranslationService use it
+# like any other backend:
+# - every call has a deadline covering all of its attempts
+# - when an attempt is slower than the p95 of recent calls, a second (hedged)
+#   attempt is sent and the first answer wins; this cuts the tail when fewer
+#   than 5% of calls are slow, a larger slow fraction needs a lower percentile
+# - transient failures are retried with exponential backoff and full jitter
+# - an AdaptiveLimiter bounds the calls in flight and a CircuitBreaker fails
+#   fast while the upstream is down
+# Blocking attempts run on a thread pool; an abandoned attempt (hedge loser or
+# past the deadline) cannot be interrupted and keeps its limiter slot until it
+# returns. Async attempts are tasks and abandoned ones are cancelled.
+class ManagedBackend(TranslationBackend):
+    def __init__(self, backend, timeout=10.0, hedge=True, hedge_percentile=0.95, hedge_delay=1.0,
+                 min_hedge_delay=0.01, max_retries=2, backoff_base=0.1, backoff_cap=2.0, limiter=None, breaker=None):
+        """
+        Args:
+            backend (TranslationBackend): Backend that sends the calls
+            timeout (float): Deadline of one call in seconds, retries included
+            hedge (bool): Send a hedged attempt when the first one is slow
+            hedge_percentile (float): Latency percentile of recent calls after
+                which the hedged attempt is sent
+            hedge_delay (float): Hedge delay until enough latencies are known
+            min_hedge_delay (float): Lower bound of the hedge delay
+            max_retries (int): Retries after the first failed attempt
+            backoff_base (float): Backoff before the first retry in seconds, doubled per retry
+            backoff_cap (float): Upper bound of the backoff in seconds
+            limiter (AdaptiveLimiter, optional): Limit of calls in flight
+            breaker (CircuitBreaker, optional): Circuit breaker of the upstream
+        """
+        self.backend = backend
+        self.name = backend.name
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_delay = hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.limiter = limiter if limiter is not None else AdaptiveLimiter()
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.latencies = LatencyTracker()
+        self._random = random.Random()
+        self._pool = ThreadPoolExecutor(max_workers=self.limiter.max_limit, thread_name_prefix='upstream')
+
+        self._events = {
+            event: metrics.UPSTREAM_EVENTS.labels(event)
+            for event in ('hedged', 'hedge_won', 'retried', 'deadline_exceeded', 'short_circuited')
+        }
+
+    def _current_hedge_delay(self):
+        delay = self.latencies.percentile(self.hedge_percentile, self.hedge_delay)
+        return max(self.min_hedge_delay, delay)
+
+    def _backoff(self, retry, deadline):
+        """
+        Sleep time before a retry, with full jitter
+
+        Returns:
+            float: Seconds to wait, or None if the retry would miss the deadline
+        """
+        delay = self._random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** retry))
+        if time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+    def _finish_attempt(self, start, error):
+        """Feed the outcome of a completed attempt to the limiter, breaker and latency tracker"""
+        latency = time.monotonic() - start
+        upstream_failure = error is not None and is_retryable(error)
+        if error is None:
+            self.latencies.add(latency)
+        self.limiter.release(latency, upstream_failure, self.latencies.percentile(0.5))
+        self.breaker.record(not upstream_failure)
+
+    def _admit(self, acquired):
+        """Check the breaker for an attempt that holds a limiter slot"""
+        if not acquired:
+            self._events['deadline_exceeded'].inc()
+            raise DeadlineExceeded('No upstream capacity before the deadline')
+        if not self.breaker.allow():
+            self.limiter.release()
+            self._events['short_circuited'].inc()
+            raise CircuitOpenError('Upstream circuit is open')
+
+    def _attempt(self, text, dest, src):
+        start = time.monotonic()
+        try:
+            result = self.backend.translate(text, dest, src)
+        except Exception as e:
+            self._finish_attempt(start, e)
+            raise
+        self._finish_attempt(start, None)
+        return result
+
+    def translate(self, text, dest='en', src='auto'):
+        deadline = time.monotonic() + self.timeout
+        for retry in range(self.max_retries + 1):
+            try:
+                return self._translate_hedged(text, dest, src, deadline)
+            except Exception as e:
+                if retry == self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(retry, deadline)
+                if delay is None:
+                    raise
+                self._events['retried'].inc()
+                time.sleep(delay)
+
+    def _translate_hedged(self, text, dest, src, deadline):
+        self._admit(self.limiter.acquire(deadline - time.monotonic()))
+        pending = {self._pool.submit(self._attempt, text, dest, src)}
+        first = next(iter(pending))
+
+        hedge_at = time.monotonic() + self._current_hedge_delay()
+        error = None
+        while pending:
+            now = time.monotonic()
+            if now >= deadline:
+                self._events['deadline_exceeded'].inc()
+                raise DeadlineExceeded(f'Upstream call exceeded its {self.timeout:.1f} s deadline')
+            hedging = self.hedge and len(pending) == 1 and error is None and hedge_at < deadline
+            timeout = (min(hedge_at, deadline) if hedging else deadline) - now
+            done, pending = wait(pending, timeout=max(0.0, timeout), return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is not first:
+                        self._events['hedge_won'].inc()
+                    return future.result()
+                error = future.exception()
+            if error is not None and not pending:
+                raise error
+            if not done and hedging and time.monotonic() >= hedge_at:
+                # Hedge only with spare capacity and a healthy upstream
+                hedge_at = deadline
+                if self.breaker.state == 'closed' and self.limiter.try_acquire():
+                    self._events['hedged'].inc()
+                    pending.add(self._pool.submit(self._attempt, text, dest, src))
+        raise error
+
+    async def _aattempt(self, text, dest, src):
+        start = time.monotonic()
+        try:
+            result = await self.backend.atranslate(text, dest, src)
+        except asyncio.CancelledError:
+            # Abandoned attempts say nothing about the upstream
+            self.limiter.release()
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            self._finish_attempt(start, e)
+            raise
+        self._finish_attempt(start, None)
+        return result
+
+    async def atranslate(self, text, dest='en', src='auto'):
+        deadline = time.monotonic() + self.timeout
+        for retry in range(self.max_retries + 1):
+            try:
+                return await self._atranslate_hedged(text, dest, src, deadline)
+            except Exception as e:
+                if retry == self.max_retries or not is_retryable(e):
+                    raise
+                delay = self._backoff(retry, deadline)
+                if delay is None:
+                    raise
+                self._events['retried'].inc()
+                await asyncio.sleep(delay)
+
+    async def _atranslate_hedged(self, text, dest, src, deadline):
+        self._admit(await self.limiter.aacquire(deadline - time.monotonic()))
+        first = asyncio.ensure_future(self._aattempt(text, dest, src))
+        pending = {first}
+
+        hedge_at = time.monotonic() + self._current_hedge_delay()
+        error = None
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    self._events['deadline_exceeded'].inc()
+                    raise DeadlineExceeded(f'Upstream call exceeded its {self.timeout:.1f} s deadline')
+                hedging = self.hedge and len(pending) == 1 and error is None and hedge_at < deadline
+                timeout = (min(hedge_at, deadline) if hedging else deadline) - now
+                done, pending = await asyncio.wait(
+                    pending, timeout=max(0.0, timeout), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        if task is not first:
+                            self._events['hedge_won'].inc()
+                        return task.result()
+                    error = task.exception()
+                if error is not None and not pending:
+                    raise error
+                if not done and hedging and time.monotonic() >= hedge_at:
+                    hedge_at = deadline
+                    if self.breaker.state == 'closed' and self.limiter.try_acquire():
+                        self._events['hedged'].inc()
+                        pending.add(asyncio.ensure_future(self._aattempt(text, dest, src)))
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def aclose(self):
+        await self.backend.aclose()
+
+    def stats(self):
+        """Return the limiter, breaker and latency state"""
+        return {
+            'limit': self.limiter.limit,
+            'in_flight': self.limiter.in_flight,
+            'circuit': self.breaker.state,
+            'hedge_delay': self._current_hedge_delay(),
+            'latency_p50': self.latencies.percentile(0.5),
+            'latency_p95': self.latencies.percentile(0.95),
+        }
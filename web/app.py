@@ -1,78 +1,238 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, abort, render_template, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+import json
 import sys
 import os
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils import translator, language_detector, text_to_speech
+from utils import (
+    get_translator, get_language_detector, get_text_to_speech, configure_text_to_speech, collect_metrics, metrics
+)
+from web.profiling import RequestProfiler
+
+# The browser plays synthesized speech (see /api/tts), so the web server runs
+# without local audio playback unless TTS_AUDIO is set explicitly
+if 'TTS_AUDIO' not in os.environ:
+    configure_text_to_speech(audio=False)
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 CORS(app)  # Enable CORS for all routes
+# Opt-in request profiling, configured by PROFILE_TOKEN, PROFILE_SAMPLE_RATE,
+# PROFILE_MODE and PROFILE_DIR (see web/profiling.py)
+profiler = RequestProfiler(app)
+
+# Maximum number of texts accepted by the batch translation endpoint
+MAX_BATCH_SIZE = 1000
+# Maximum number of texts accepted by the batch detection endpoint
+MAX_DETECT_BATCH_SIZE = 100000
+# Synthesized audio is addressed by the hash of its text, so a URL never
+# changes content and browsers and proxies may keep it for a year
+AUDIO_MAX_AGE = 365 * 24 * 3600
+
+metrics.REGISTRY.add_collector(collect_metrics)
+
+def read_json():
+    """Parse the JSON request body, timed as the parse stage"""
+    with metrics.PARSE.time():
+        return request.json
+
+@app.before_request
+def start_request_metrics():
+    metrics.HTTP_IN_FLIGHT.inc()
+
+@app.after_request
+def count_request(response):
+    metrics.HTTP_REQUESTS.labels(request.endpoint or 'unknown', response.status_code).inc()
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    metrics.HTTP_IN_FLIGHT.dec()
 
 @app.route('/')
 def index():
     """Render main page"""
-    languages = translator.get_languages()
+    languages = get_translator().get_languages()
     return render_template('index.html', languages=languages)
 
-@app.route('/api/detect', methods=['POST'])
-def detect_language():
-    """API endpoint to detect language of text"""
-    data = request.json
+def detect_response(data):
+    """
+    Detect the language of data['text'], with ranked alternatives when
+    data['top_k'] is set
+
+    Shared by the Flask and ASGI endpoints.
+
+    Returns:
+        dict: Response payload
+    """
     text = data.get('text', '')
     
     if not text.strip():
-        return jsonify({'success': False, 'error': 'Text is empty'})
+        return {'success': False, 'error': 'Text is empty'}
         
-    result = language_detector.detect_language(text)
-    
-    if result:
-        return jsonify({
-            'success': True,
-            'language': result
-        })
-    else:
-        return jsonify({
-            'success': False,
-            'error': 'Could not detect language'
-        })
+    language_detector = get_language_detector()
+    if not data.get('top_k'):
+        result = language_detector.detect_language(text)
+        if result:
+            return {'success': True, 'language': result}
+        return {'success': False, 'error': 'Could not detect language'}
+        
+    # Optional ranked alternatives with probabilities; the detected language
+    # is the first of them, so the text is scored once
+    try:
+        top_k = int(data['top_k'])
+    except (TypeError, ValueError):
+        top_k = 0
+    if top_k < 1:
+        return {'success': False, 'error': 'top_k must be a positive integer'}
+        
+    candidates = language_detector.detect_candidates(text, top_k)
+    if not candidates:
+        return {'success': False, 'error': 'Could not detect language'}
+    return {
+        'success': True,
+        'language': language_detector.language_info(candidates[0]['code']),
+        'candidates': candidates
+    }
+
+@app.route('/api/detect', methods=['POST'])
+def detect_language():
+    """API endpoint to detect language of text"""
+    return jsonify(detect_response(read_json()))
+
+@app.route('/api/detect/batch', methods=['POST'])
+def detect_batch():
+    """API endpoint to detect the language of a list of texts"""
+    data = read_json()
+    texts = data.get('texts')
+
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({'success': False, 'error': 'texts must be a list of strings'})
+
+    if len(texts) > MAX_DETECT_BATCH_SIZE:
+        return jsonify({'success': False, 'error': f'Batch is limited to {MAX_DETECT_BATCH_SIZE} texts'})
+
+    results = get_language_detector().detect_batch(texts)
+    return jsonify({
+        'success': True,
+        'results': results
+    })
 
 @app.route('/api/translate', methods=['POST'])
 def translate_text():
     """API endpoint to translate text"""
-    data = request.json
+    data = read_json()
     text = data.get('text', '')
     target_lang = data.get('target_lang', 'en')
     source_lang = data.get('source_lang')
     
-    result = translator.translate_text(text, target_lang, source_lang)
+    result = get_translator().translate_text(text, target_lang, source_lang)
     return jsonify(result)
 
+@app.route('/api/translate/stream', methods=['POST'])
+def translate_stream():
+    """API endpoint that streams translated segments as NDJSON while they complete"""
+    data = read_json()
+    text = data.get('text', '')
+    target_lang = data.get('target_lang', 'en')
+    source_lang = data.get('source_lang')
+
+    def generate():
+        for event in get_translator().translate_stream(text, target_lang, source_lang):
+            yield json.dumps(event) + '\n'
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='application/x-ndjson',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/translate/batch', methods=['POST'])
+def translate_batch():
+    """API endpoint to translate a list of texts in one request"""
+    data = read_json()
+    texts = data.get('texts')
+    target_lang = data.get('target_lang', 'en')
+    source_lang = data.get('source_lang')
+
+    if not isinstance(texts, list) or not all(isinstance(text, str) for text in texts):
+        return jsonify({'success': False, 'error': 'texts must be a list of strings'})
+
+    if len(texts) > MAX_BATCH_SIZE:
+        return jsonify({'success': False, 'error': f'Batch is limited to {MAX_BATCH_SIZE} texts'})
+
+    results = get_translator().translate_batch(texts, target_lang, source_lang)
+    return jsonify({
+        'success': True,
+        'results': results
+    })
+
 @app.route('/api/speak', methods=['POST'])
 def speak_text():
     """API endpoint to convert text to speech and play it"""
-    data = request.json
+    data = read_json()
     text = data.get('text', '')
     lang = data.get('lang', 'en')
     
-    success = text_to_speech.text_to_speech_memory(text, lang)
+    success = get_text_to_speech().text_to_speech_memory(text, lang)
     
     return jsonify({
         'success': success,
         'error': None if success else 'Failed to generate speech'
     })
 
+@app.route('/api/tts', methods=['POST'])
+def synthesize_speech():
+    """API endpoint to synthesize speech and return the URL of the MP3 audio"""
+    data = read_json()
+    text = data.get('text', '')
+    lang = data.get('lang', 'en')
+    slow = bool(data.get('slow', False))
+
+    if not text.strip():
+        return jsonify({'success': False, 'error': 'Text is empty'})
+
+    text_to_speech = get_text_to_speech()
+    try:
+        text_to_speech.synthesize(text, lang, slow)
+    except Exception:
+        return jsonify({'success': False, 'error': 'Failed to generate speech'})
+
+    key = text_to_speech.audio_cache.make_key(text, lang, slow)
+    return jsonify({
+        'success': True,
+        'url': f'/api/tts/{key}.mp3'
+    })
+
+@app.route('/api/tts/<key>.mp3', methods=['GET'])
+def get_speech_audio(key):
+    """Serve synthesized MP3 audio with ETag, caching and Range support"""
+    path = get_text_to_speech().audio_cache.get_path(key)
+    if path is None:
+        abort(404)
+
+    response = send_file(path, mimetype='audio/mpeg', conditional=True, etag=key, max_age=AUDIO_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    response.accept_ranges = 'bytes'
+    return response
+
 @app.route('/api/stop-audio', methods=['POST'])
 def stop_audio():
     """API endpoint to stop any currently playing audio"""
-    text_to_speech.stop_audio()
+    get_text_to_speech().stop_audio()
     return jsonify({'success': True})
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose stage latencies, in-flight operations, errors and cache ratios for Prometheus"""
+    return Response(metrics.REGISTRY.expose(), content_type=metrics.CONTENT_TYPE)
+
 @app.route('/api/languages', methods=['GET'])
 def get_languages():
     """API endpoint to get available languages"""
-    return jsonify(translator.get_languages())
+    return jsonify(get_translator().get_languages())
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
@@ -0,0 +1,152 @@
+from asgiref.wsgi import WsgiToAsgi
+import asyncio
+import json
+import sys
+import os
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils import get_translator, get_text_to_speech
+from utils import metrics
+from utils.async_translator import AsyncTranslationService
+from web.app import app as flask_app, detect_response
+
+# ASGI entry point for the web application.
+# The translation, detection and speech endpoints are served natively on the
+# event loop: translations use the async upstream client and the blocking
+# detector/TTS calls are moved to worker threads. Every other route (pages,
+# static files, batch API) is forwarded to the Flask app.
+# Run with: uvicorn web.asgi:app --port 5000
+wsgi_app = WsgiToAsgi(flask_app)
+# Created on the first translation, like the services it wraps
+_async_translator = None
+
+
+def get_async_translator():
+    """Return the AsyncTranslationService of the shared translator, creating it on first use"""
+    global _async_translator
+    if _async_translator is None:
+        _async_translator = AsyncTranslationService(get_translator())
+    return _async_translator
+
+
+async def read_json(receive):
+    """Read the full request body and decode it as JSON"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    with metrics.PARSE.time():
+        return json.loads(body) if body else {}
+
+
+async def send_json(send, payload, status=200):
+    """Send a JSON response"""
+    body = json.dumps(payload).encode('utf-8')
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(body)).encode('ascii')),
+            (b'access-control-allow-origin', b'*'),
+        ],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def detect_language(data):
+    """API endpoint to detect language of text"""
+    return await asyncio.to_thread(detect_response, data)
+
+
+async def translate_text(data):
+    """API endpoint to translate text"""
+    text = data.get('text', '')
+    target_lang = data.get('target_lang', 'en')
+    source_lang = data.get('source_lang')
+
+    return await get_async_translator().translate_text(text, target_lang, source_lang)
+
+
+async def speak_text(data):
+    """API endpoint to convert text to speech and play it"""
+    text = data.get('text', '')
+    lang = data.get('lang', 'en')
+
+    success = await asyncio.to_thread(get_text_to_speech().text_to_speech_memory, text, lang)
+
+    return {
+        'success': success,
+        'error': None if success else 'Failed to generate speech'
+    }
+
+
+async def synthesize_speech(data):
+    """API endpoint to synthesize speech and return the URL of the MP3 audio"""
+    text = data.get('text', '')
+    lang = data.get('lang', 'en')
+    slow = bool(data.get('slow', False))
+
+    if not text.strip():
+        return {'success': False, 'error': 'Text is empty'}
+
+    text_to_speech = get_text_to_speech()
+    try:
+        await asyncio.to_thread(text_to_speech.synthesize, text, lang, slow)
+    except Exception:
+        return {'success': False, 'error': 'Failed to generate speech'}
+
+    key = text_to_speech.audio_cache.make_key(text, lang, slow)
+    return {
+        'success': True,
+        'url': f'/api/tts/{key}.mp3'
+    }
+
+
+routes = {
+    '/api/detect': detect_language,
+    '/api/translate': translate_text,
+    '/api/speak': speak_text,
+    '/api/tts': synthesize_speech,
+}
+
+
+async def lifespan(receive, send):
+    """Handle ASGI startup and shutdown events"""
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            if _async_translator is not None:
+                await _async_translator.aclose()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send):
+    """ASGI application"""
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    handler = routes.get(scope.get('path'))
+    if scope['type'] != 'http' or handler is None or scope['method'] != 'POST':
+        await wsgi_app(scope, receive, send)
+        return
+
+    metrics.HTTP_IN_FLIGHT.inc()
+    try:
+        try:
+            data = await read_json(receive)
+        except ValueError:
+            status, payload = 400, {'success': False, 'error': 'Invalid JSON body'}
+        else:
+            status, payload = 200, await handler(data)
+        metrics.HTTP_REQUESTS.labels(handler.__name__, status).inc()
+        await send_json(send, payload, status=status)
+    finally:
+        metrics.HTTP_IN_FLIGHT.dec()
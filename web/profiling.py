@@ -0,0 +1,228 @@
+from flask import g, jsonify, request, send_file, abort
+import cProfile
+import hmac
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Profile files are named <unix time in ms>-<endpoint>-<duration in ms>ms-<random>.<format>
+_PROFILE_NAME = re.compile(r'(\d+)-(\w+)-(\d+)ms-([0-9a-f]{8})\.(prof|folded)')
+
+
+# RequestProfiler profiles selected Flask requests on demand. A request is
+# profiled when it carries the X-Profile header with the configured token, or
+# when it is picked by the sampling rate; every other request only pays for
+# one random number and, with a token set, a header lookup. Two modes are available:
+# 'cprofile' saves a pstats file (snakeviz, pstats, flameprof) with exact call
+# counts and CPU time, and 'sample' records the request thread's stack every
+# few milliseconds into a folded stack file (flamegraph.pl, speedscope) that
+# also shows the time spent waiting on locks, sockets and other threads.
+# Profiles go to a directory that is pruned to `max_bytes`, oldest first. They
+# reveal code paths and request stacks, so they are listed at GET /api/profiles
+# for requests carrying the token only; without a token the routes do not exist
+# and profiles are read from the directory. cProfile hooks the whole interpreter on
+# Python 3.12+, so only one request is profiled in that mode at a time and
+# requests arriving meanwhile are served without a profile.
+class RequestProfiler:
+    HEADER = 'X-Profile'
+
+    def __init__(self, app=None, directory=None, sample_rate=None, token=None, mode=None,
+                 max_bytes=64 * 1024 * 1024, interval=0.001):
+        """
+        Args:
+            app (Flask, optional): Application to install the hooks on
+            directory (str, optional): Profile directory. Defaults to PROFILE_DIR
+                or a folder in the system temp directory
+            sample_rate (float, optional): Fraction of requests profiled without
+                the header. Defaults to PROFILE_SAMPLE_RATE or 0
+            token (str, optional): Value of the X-Profile header that requests a
+                profile and may list profiles. Defaults to PROFILE_TOKEN; when unset
+                the header is ignored and profiles are not served over HTTP
+            mode (str, optional): 'cprofile' or 'sample'. Defaults to PROFILE_MODE
+                or 'cprofile'
+            max_bytes (int): Disk size cap of the profile directory
+            interval (float): Seconds between stack samples in 'sample' mode
+        """
+        self.directory = directory or os.environ.get(
+            'PROFILE_DIR', os.path.join(tempfile.gettempdir(), 'ai_translator_profiles')
+        )
+        if sample_rate is None:
+            sample_rate = float(os.environ.get('PROFILE_SAMPLE_RATE', '0') or 0)
+        self.sample_rate = sample_rate
+        self.token = token if token is not None else os.environ.get('PROFILE_TOKEN') or None
+        self.mode = mode or os.environ.get('PROFILE_MODE', 'cprofile')
+        if self.mode not in ('cprofile', 'sample'):
+            raise ValueError(f'Unknown profile mode: {self.mode}')
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Install the request hooks and, when a token is set, the listing endpoints"""
+        app.before_request(self._start)
+        app.teardown_request(self._finish)
+        if self.token is None:
+            return
+        app.add_url_rule('/api/profiles', 'list_profiles', self.list_profiles, methods=['GET'])
+        app.add_url_rule('/api/profiles/<name>', 'get_profile', self.get_profile, methods=['GET'])
+
+    def _authorized(self):
+        """Whether the request carries the configured token"""
+        header = request.headers.get(self.HEADER)
+        return self.token is not None and header is not None and hmac.compare_digest(header, self.token)
+
+    def _start(self):
+        sampled = self.sample_rate and random.random() < self.sample_rate
+        if not sampled and (self.token is None or not self._authorized()):
+            return
+        if request.endpoint in ('list_profiles', 'get_profile', 'static'):
+            return
+
+        if self.mode == 'cprofile':
+            if not self._cprofile_lock.acquire(blocking=False):
+                return
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # Another profiler (a debugger, coverage) already hooks the interpreter
+                self._cprofile_lock.release()
+                logger.warning(f"Request not profiled: {str(e)}")
+                return
+        else:
+            profiler = _StackSampler(threading.get_ident(), self.interval)
+            profiler.enable()
+        g.profiler = profiler
+        g.profile_start = time.perf_counter()
+
+    def _finish(self, error=None):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            return
+        profiler.disable()
+        if self.mode == 'cprofile':
+            self._cprofile_lock.release()
+        duration_ms = int((time.perf_counter() - g.profile_start) * 1000)
+        name = (
+            f"{int(time.time() * 1000)}-{request.endpoint or 'unknown'}-{duration_ms}ms-"
+            f"{os.urandom(4).hex()}.{'prof' if self.mode == 'cprofile' else 'folded'}"
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            profiler.dump_stats(os.path.join(self.directory, name))
+        except OSError as e:
+            logger.error(f"Failed to save profile {name}: {str(e)}")
+            return
+        self._prune()
+
+    def _profiles(self):
+        """List (mtime, size, name) of the saved profiles"""
+        entries = []
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return entries
+        for name in names:
+            if not _PROFILE_NAME.fullmatch(name):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+        return entries
+
+    def _prune(self):
+        """Remove the oldest profiles until the directory fits in `max_bytes`"""
+        with self._lock:
+            entries = sorted(self._profiles())
+            total = sum(size for _, size, _ in entries)
+            for _, size, name in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+                total -= size
+
+    def list_profiles(self):
+        """API endpoint listing the most recent profiles, newest first"""
+        if not self._authorized():
+            abort(403)
+        limit = request.args.get('limit', 50, type=int)
+        profiles = []
+        for mtime, size, name in sorted(self._profiles(), reverse=True)[:limit]:
+            created_ms, endpoint, duration_ms, _, kind = _PROFILE_NAME.fullmatch(name).groups()
+            profiles.append({
+                'name': name,
+                'endpoint': endpoint,
+                'duration_ms': int(duration_ms),
+                'created': int(created_ms) / 1000,
+                'format': 'pstats' if kind == 'prof' else 'folded',
+                'bytes': size,
+                'url': f'/api/profiles/{name}',
+            })
+        return jsonify({'success': True, 'profiles': profiles})
+
+    def get_profile(self, name):
+        """API endpoint downloading one profile"""
+        if not self._authorized():
+            abort(403)
+        if not _PROFILE_NAME.fullmatch(name):
+            abort(404)
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            abort(404)
+        mimetype = 'application/octet-stream' if name.endswith('.prof') else 'text/plain'
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=name)
+
+
+# _StackSampler records the stack of one thread at a fixed interval from a
+# helper thread and counts identical stacks, which is the folded format
+# ("outer;inner;leaf count" per line) flame graph tools read. It has the
+# enable/disable/dump_stats interface of cProfile.Profile.
+class _StackSampler:
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def enable(self):
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if names:
+                stack = ';'.join(reversed(names))
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def dump_stats(self, path):
+        with open(path, 'w', encoding='utf-8') as profile_file:
+            for stack, count in self.stacks.items():
+                profile_file.write(f'{stack} {count}\n')
@@ -0,0 +1,68 @@
+import gc
+import multiprocessing
+import os
+import sys
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gunicorn.app.base import BaseApplication
+
+# Production server for the web application, built on gunicorn.
+# The master process imports the Flask app and warms the services (detector
+# profiles, upstream client, TTS) before forking, and freezes the garbage
+# collector so those objects stay shared copy-on-write between the workers.
+# Each worker serves requests on a pool of threads. Send SIGHUP to the master
+# for a graceful restart of all workers, and SIGTERM for a graceful shutdown;
+# workers are also recycled after `max_requests` requests.
+# Every worker starts its own process pool for batch language detection on
+# first use; the pools are sized so that together they use about one process
+# per CPU instead of one per CPU each.
+# gunicorn needs a Unix-like system; use run_web.py without --production on Windows.
+class WebServer(BaseApplication):
+    def __init__(self, bind='127.0.0.1:5000', workers=None, threads=8, timeout=60,
+                 graceful_timeout=30, max_requests=0, detect_workers=None):
+        """
+        Args:
+            bind (str): Address to listen on, host:port
+            workers (int, optional): Worker processes. Defaults to the number of CPUs
+            threads (int): Request threads per worker
+            timeout (int): Seconds before a silent worker is killed and restarted
+            graceful_timeout (int): Seconds workers get to finish requests on restart
+            max_requests (int): Restart a worker after this many requests (0 = never)
+            detect_workers (int, optional): Batch detection processes per worker.
+                Defaults to DETECT_BATCH_WORKERS or the CPUs divided by the workers
+        """
+        workers = workers or multiprocessing.cpu_count()
+        if detect_workers is None:
+            detect_workers = int(os.environ.get('DETECT_BATCH_WORKERS') or 0)
+        self.detect_workers = detect_workers or max(1, multiprocessing.cpu_count() // workers)
+        self.options = {
+            'bind': bind,
+            'workers': workers,
+            'threads': threads,
+            'worker_class': 'gthread',
+            'timeout': timeout,
+            'graceful_timeout': graceful_timeout,
+            'max_requests': max_requests,
+            'max_requests_jitter': max_requests // 10,
+            'preload_app': True,
+            'accesslog': '-',
+        }
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        """Import and warm the application in the master process"""
+        from utils import get_language_detector, warm_up
+        from web.app import app
+
+        warm_up()
+        get_language_detector().batch_workers = self.detect_workers
+        # Objects created so far are never freed; keeping the collector away
+        # from them avoids touching (and copying) their pages in every worker
+        gc.freeze()
+        return app
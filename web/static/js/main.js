@@ -11,6 +11,8 @@ document.addEventListener('DOMContentLoaded', function() {
     // Variables
     let lastDetectedLanguage = null;
     let typingTimer;
+    let translationController = null;
+    const audioPlayer = new Audio();
     const doneTypingInterval = 500; // Time in ms (0.5 seconds)
     
     // Initialize
@@ -81,14 +83,23 @@ document.addEventListener('DOMContentLoaded', function() {
     }
     
     // Handle translation
+    // Segments are streamed as NDJSON and rendered as soon as each one arrives
     async function handleTranslation() {
+        // Cancel a translation that is still streaming
+        if (translationController) {
+            translationController.abort();
+        }
+        
         if (!sourceText.value.trim()) {
             targetText.value = '';
             return;
         }
         
+        const controller = new AbortController();
+        translationController = controller;
+        
         try {
-            const response = await fetch('/api/translate', {
+            const response = await fetch('/api/translate/stream', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -97,22 +108,58 @@ document.addEventListener('DOMContentLoaded', function() {
                     text: sourceText.value,
                     target_lang: targetLanguage.value,
                     source_lang: lastDetectedLanguage
-                })
+                }),
+                signal: controller.signal
             });
             
-            const data = await response.json();
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let segments = [];
             
-            if (data.success) {
-                targetText.value = data.translated_text;
-            } else {
-                targetText.value = 'Translation error: ' + (data.error || 'Unknown error');
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                
+                for (const line of lines) {
+                    if (line.trim()) {
+                        segments = handleTranslationEvent(JSON.parse(line), segments);
+                    }
+                }
             }
         } catch (error) {
+            if (error.name === 'AbortError') return;
             console.error('Error translating:', error);
             targetText.value = 'Translation service error';
+        } finally {
+            if (translationController === controller) {
+                translationController = null;
+            }
         }
     }
     
+    // Apply one streamed translation event to the target panel
+    function handleTranslationEvent(event, segments) {
+        if (event.event === 'start') {
+            segments = new Array(event.segments).fill('');
+            targetText.value = '';
+        } else if (event.event === 'segment') {
+            segments[event.index] = event.translated_text + event.separator;
+            targetText.value = segments.join('');
+        } else if (event.event === 'end') {
+            if (event.success) {
+                targetText.value = event.translated_text;
+            } else {
+                targetText.value = 'Translation error: ' + (event.error || 'Unknown error');
+            }
+        }
+        return segments;
+    }
+    
     // Handle swap languages
     function handleSwapLanguages() {
         // Only allow swap if we have a detected language
@@ -140,12 +187,10 @@ document.addEventListener('DOMContentLoaded', function() {
         
         try {
             // First stop any currently playing audio
-            await fetch('/api/stop-audio', {
-                method: 'POST'
-            });
+            audioPlayer.pause();
             
-            // Then play the new text
-            const response = await fetch('/api/speak', {
+            // Then synthesize the new text and play it in the browser
+            const response = await fetch('/api/tts', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
@@ -160,7 +205,11 @@ document.addEventListener('DOMContentLoaded', function() {
             
             if (!data.success) {
                 console.error('TTS error:', data.error);
+                return;
             }
+            
+            audioPlayer.src = data.url;
+            await audioPlayer.play();
         } catch (error) {
             console.error('Error with text-to-speech:', error);
         }